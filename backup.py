@@ -1,6 +1,47 @@
 import os
-from shutil import copy2
-from PyQt6.QtCore import QObject, QThreadPool, QRunnable, pyqtSignal
+import re
+import sys
+import gzip
+import lzma
+import time
+import shutil
+import logging
+import argparse
+import threading
+import subprocess
+import orjson
+import sqlite3
+import pathlib
+import tempfile
+from datetime import datetime
+from contextlib import closing
+from PyQt6.QtCore import QObject, QEvent, QThreadPool, QRunnable, QTimer, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+from PyQt6.QtWidgets import QApplication
+from database import openDatabase
+
+logger = logging.getLogger(__name__)
+
+STEP_PAGES = 256
+"""pages copied per backup step"""
+STEP_PAUSE = 0.005
+"""seconds to yield to writers between steps"""
+TRACKED_TABLES = ("topics", "problems", "notes")
+"""tables in the change log, parents first"""
+COMPRESSORS = {"gzip": (gzip.open, ".gz"), "lzma": (lzma.open, ".xz")}
+"""compression -> (opener, file extension)"""
+STAMP_FORMAT = "%Y%m%d-%H%M%S"
+"""time stamp in scheduled backup names"""
+IDLE_SECS = 60
+"""seconds without user input before a scheduled backup may run"""
+RESTORE_STEP_PAGES = 4096
+"""pages copied per restore step; nothing else writes during a restore"""
+INPUT_EVENTS = {
+    QEvent.Type.KeyPress,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseMove,
+    QEvent.Type.Wheel,
+}
 
 
 class FileTransferSignals(QObject):
@@ -9,10 +50,322 @@ class FileTransferSignals(QObject):
     errored = pyqtSignal(str)
     # done msg
     done = pyqtSignal(str)
+    # percent done
+    progress = pyqtSignal(int)
+    # kind, path, seq of the last change in it; logged in the live database
+    # by the database worker, the only writer besides the GUI
+    backedUp = pyqtSignal(str, str, int)
+
+
+def snapshot(src: str, dest: str, progress=None):
+    """
+    copy the live database `src` to `dest` with the SQLite online backup API;
+    `progress(remaining, total)` is called after every step
+    """
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress(remaining, total)
+        # release the source between steps
+        time.sleep(STEP_PAUSE)
+
+    with closing(sqlite3.connect(src)) as source, closing(
+        sqlite3.connect(dest)
+    ) as target:
+        source.backup(target, pages=STEP_PAGES, progress=on_step)
+
+
+def restore(src: str, dest: str, progress=None):
+    """
+    copy the backup `src` over the database `dest`, which no other process
+    may have open; `progress(remaining, total)` is called after every step
+    """
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress(remaining, total)
+
+    with closing(sqlite3.connect(src)) as source, closing(
+        sqlite3.connect(dest)
+    ) as target:
+        source.backup(target, pages=RESTORE_STEP_PAGES, progress=on_step)
+        # the restored copy is not the base of later incremental backups
+        with target:
+            target.execute("DELETE FROM backup_log")
+
+
+def runChild(command: str, *args: str, progress=None):
+    """
+    run `python backup.py command args...` in a process of its own; SQLite
+    locks are per process, so the copy of SQLite in this module must not open
+    the live database next to the app's Qt connections.
+    `progress(remaining, total)` is called for every step the child reports
+    """
+    child = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), command, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        # no console window flashes up on Windows
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    for line in child.stdout:
+        if progress:
+            progress(*map(int, line.split()))
+    error = child.stderr.read().strip()
+    if child.wait():
+        raise RuntimeError(error or f"Backup {command} exited with {child.returncode}")
+
+
+def lastChange(conn: sqlite3.Connection):
+    """seq of the latest logged change, even if it was pruned"""
+    return conn.execute(
+        "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'changelog'"
+    ).fetchone()[0]
+
+
+def lastBackup(conn: sqlite3.Connection):
+    """seq of the last change included in a backup, None if never backed up"""
+    return conn.execute("SELECT MAX(seq) FROM backup_log").fetchone()[0]
+
+
+def logBackup(conn: sqlite3.Connection, kind: str, path: str, seq: int):
+    """record a backup up to change `seq`"""
+    with conn:
+        conn.execute(
+            "INSERT INTO backup_log (timestamp, kind, path, seq) VALUES (?, ?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), kind, path, seq),
+        )
+
+
+def commitBackup(db: QSqlDatabase, kind: str, path: str, seq: int):
+    """
+    log the backup at `path` in the live database and forget the changes it
+    holds; a write job for the database worker
+    """
+    query = QSqlQuery(db=db)
+    for sql, values in (
+        (
+            "INSERT INTO backup_log (timestamp, kind, path, seq) VALUES (?, ?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), kind, path, seq),
+        ),
+        ("DELETE FROM changelog WHERE seq <= ?", (seq,)),
+    ):
+        query.prepare(sql)
+        for value in values:
+            query.addBindValue(value)
+        if not query.exec():
+            raise RuntimeError(query.lastError().text())
+
+
+def markSnapshot(snapshot_path: str, path: str):
+    """log, in the snapshot, that it is the full backup kept at `path`; returns seq"""
+    with closing(sqlite3.connect(snapshot_path)) as target:
+        seq = lastChange(target)
+        logBackup(target, "full", path, seq)
+    return seq
+
+
+def changeset(db: QSqlDatabase):
+    """
+    rows changed since the last backup, as a dict ready to be serialized;
+    None if the database was never backed up
+    """
+    query = QSqlQuery(db=db)
+    query.setForwardOnly(True)
+
+    def rows(sql: str, *values):
+        query.prepare(sql)
+        for value in values:
+            query.addBindValue(value)
+        if not query.exec():
+            raise RuntimeError(query.lastError().text())
+        width = query.record().count()
+        found = []
+        while query.next():
+            found.append([query.value(i) for i in range(width)])
+        return found
+
+    # one read transaction; a consistent view of the log and the rows
+    if not db.transaction():
+        raise RuntimeError(db.lastError().text())
+    try:
+        ((since,),) = rows("SELECT MAX(seq) FROM backup_log")
+        if since is None:
+            return None
+        ((upto,),) = rows(
+            "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence "
+            "WHERE name = 'changelog'"
+        )
+
+        tables = {}
+        for table in TRACKED_TABLES:
+            ids = [
+                row_id
+                for (row_id,) in rows(
+                    "SELECT DISTINCT row_id FROM changelog WHERE tbl = ? AND seq > ?",
+                    table,
+                    since,
+                )
+            ]
+            if not ids:
+                continue
+
+            rows(f"SELECT * FROM {table} LIMIT 0")
+            record = query.record()
+            columns = [record.fieldName(i) for i in range(record.count())]
+            found = []
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                marks = ", ".join("?" * len(chunk))
+                found += rows(f"SELECT * FROM {table} WHERE id IN ({marks})", *chunk)
+
+            # logged ids that no longer exist were deleted
+            kept = {row[0] for row in found}
+            tables[table] = {
+                "columns": columns,
+                "rows": found,
+                "deleted": [row_id for row_id in ids if row_id not in kept],
+            }
+    finally:
+        query.finish()
+        db.rollback()
+
+    return {"since": since, "upto": upto, "tables": tables}
+
+
+def readChangeset(path: str):
+    """
+    changeset of the live database at `path`, read through a Qt connection
+    of the calling thread's own; the app's connections see its locks
+    """
+    name = f"changeset-{threading.get_ident()}"
+    db = openDatabase(path, {}, name=name)
+    try:
+        if not db.isOpen():
+            raise RuntimeError(db.lastError().text())
+        return changeset(db)
+    finally:
+        db.close()
+        del db
+        QSqlDatabase.removeDatabase(name)
+
+
+def replay(snapshot_path: str, changeset_paths: list[str]):
+    """apply changesets, oldest first, to the full snapshot they follow"""
+    changesets = []
+    for path in changeset_paths:
+        with gzip.open(path, "rb") as file:
+            changesets.append(orjson.loads(file.read()))
+    changesets.sort(key=lambda c: c["since"])
+
+    with closing(sqlite3.connect(snapshot_path)) as conn:
+        for changes in changesets:
+            base = lastBackup(conn) or 0
+            if changes["since"] != base:
+                raise ValueError(
+                    f"Changeset from change {changes['since']} does not follow "
+                    f"the snapshot at change {base}"
+                )
+
+            with conn:
+                tables = changes["tables"]
+                # children are deleted before, and inserted after, their parents
+                for table in reversed(TRACKED_TABLES):
+                    if deleted := tables.get(table, {}).get("deleted"):
+                        conn.executemany(
+                            f"DELETE FROM {table} WHERE id = ?",
+                            ((row_id,) for row_id in deleted),
+                        )
+                for table in TRACKED_TABLES:
+                    if not (rows := tables.get(table, {}).get("rows")):
+                        continue
+                    columns = tables[table]["columns"]
+                    # an upsert fires the update triggers that keep the search index
+                    updates = ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+                    conn.executemany(
+                        f"""
+                        INSERT INTO {table} ({', '.join(columns)})
+                        VALUES ({', '.join('?' * len(columns))})
+                        ON CONFLICT (id) DO UPDATE SET {updates}
+                        """,
+                        rows,
+                    )
+                # changes logged by the triggers above are already in the snapshot
+                conn.execute("DELETE FROM changelog")
+
+            logBackup(conn, "replay", snapshot_path, changes["upto"])
+
+
+def compress(src: str, dest: str, compression: str):
+    """stream `src` into the compressed file `dest`"""
+    opener, _ = COMPRESSORS[compression]
+    with open(src, "rb") as source, opener(dest, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+
 
+def scheduledBackups(backup_dir: str, name: str):
+    """(time, path) of the scheduled backups of `name`, newest first"""
+    pattern = re.compile(rf"{re.escape(name)}-(\d{{8}}-\d{{6}})\.sqlite\.(gz|xz)")
+    backups = []
+    for entry in os.scandir(backup_dir):
+        if match := pattern.fullmatch(entry.name):
+            backups.append(
+                (datetime.strptime(match.group(1), STAMP_FORMAT), entry.path)
+            )
+    return sorted(backups, reverse=True)
 
-class FileCopyWorker(QRunnable):
-    """file copy runnable"""
+
+def rotate(backup_dir: str, name: str, keep_daily: int, keep_weekly: int):
+    """
+    keep the newest backup of each of the last `keep_daily` days
+    and of each of the last `keep_weekly` weeks; delete the rest
+    """
+    days, weeks = set(), set()
+    for when, path in scheduledBackups(backup_dir, name):
+        day, week = when.date(), when.isocalendar()[:2]
+        keep = False
+        if day not in days and len(days) < keep_daily:
+            days.add(day)
+            keep = True
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks.add(week)
+            keep = True
+
+        if not keep:
+            os.remove(path)
+            logger.info(f"Rotated out backup '{path}'")
+
+
+def decompress(src: str, dest: str):
+    """stream the compressed file `src` into `dest`"""
+    opener = next(o for o, ext in COMPRESSORS.values() if src.endswith(ext))
+    with opener(src, "rb") as source, open(dest, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+
+
+def isCompressed(path: str):
+    return path.endswith(tuple(ext for _, ext in COMPRESSORS.values()))
+
+
+def check(path: str, full: bool = False):
+    """
+    problems `PRAGMA quick_check` (or `integrity_check` if full) finds
+    in the database `path`, opened read-only; empty if none
+    """
+    pragma = "integrity_check" if full else "quick_check"
+    # as_uri escapes "?", "#" and "%" in the path
+    uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as conn:
+        results = [row[0] for row in conn.execute(f"PRAGMA {pragma}")]
+    return [] if results == ["ok"] else results
+
+
+class BackupWorker(QRunnable):
+    """
+    consistent copy of a live database, made in page-sized steps by a child
+    process; `backedUp` asks for it to be logged as the base of later changesets
+    """
 
     __slots__ = ("dest_dir", "signals")
 
@@ -25,17 +378,381 @@ class FileCopyWorker(QRunnable):
 
         self.signals = FileTransferSignals()
 
+    def _progress(self, remaining: int, total: int):
+        if total:
+            self.signals.progress.emit(100 * (total - remaining) // total)
+
     def run(self):
         dest_file = os.path.join(self.dest_dir, os.path.basename(self.src))
+        # never leave a half-written copy at dest_file
+        part_file = f"{dest_file}.part"
+
+        try:
+            runChild("snapshot", self.src, part_file, progress=self._progress)
+            seq = markSnapshot(part_file, dest_file)
+            # overwrites existing
+            os.replace(part_file, dest_file)
+            self.signals.backedUp.emit("full", dest_file, seq)
+            self.signals.done.emit(f"'{self.src}' backed up to '{dest_file}'")
+
+        except Exception as e:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+            self.signals.errored.emit(str(e))
+
+
+class IncrementalBackupWorker(QRunnable):
+    """
+    compressed changeset of the rows changed since the last backup;
+    `backedUp` asks for the changes in it to be pruned
+    """
+
+    __slots__ = ("dest_dir", "signals")
 
+    def __init__(self, src: str, dest_dir: str):
+        super().__init__()
+        self.setAutoDelete(True)
+
+        self.src = src
+        self.dest_dir = dest_dir
+
+        self.signals = FileTransferSignals()
+
+    def run(self):
         try:
-            # passing a file as dest overwrites existing
-            # passing a folder as dest raises error if file exists
-            copy2(self.src, dest_file)
-            self.signals.done.emit(f"'{self.src}' copied to '{dest_file}'")
+            changes = readChangeset(self.src)
+            if changes is None:
+                self.signals.errored.emit(
+                    "Make a full backup first; changes are saved on top of it"
+                )
+                return
+
+            since, upto = changes["since"], changes["upto"]
+            if upto == since:
+                self.signals.done.emit("No changes since the last backup")
+                return
+
+            name, _ = os.path.splitext(os.path.basename(self.src))
+            dest_file = os.path.join(
+                self.dest_dir, f"{name}-changes-{since}-{upto}.json.gz"
+            )
+            with gzip.open(dest_file, "wb") as file:
+                file.write(orjson.dumps(changes))
+
+            self.signals.backedUp.emit("incremental", dest_file, upto)
+            self.signals.done.emit(
+                f"Changes {since + 1} to {upto} saved to '{dest_file}'"
+            )
 
         except Exception as e:
             self.signals.errored.emit(str(e))
 
 
+class VerifyWorker(QRunnable):
+    """check a backup, decompressing it first if needed"""
+
+    __slots__ = ("path", "full", "signals")
+
+    def __init__(self, path: str, full: bool = False):
+        super().__init__()
+        self.setAutoDelete(True)
+
+        self.path = path
+        self.full = full
+
+        self.signals = FileTransferSignals()
+
+    def run(self):
+        db_file, temp_file = self.path, None
+        try:
+            if isCompressed(self.path):
+                fd, temp_file = tempfile.mkstemp(suffix=".sqlite")
+                os.close(fd)
+                decompress(self.path, temp_file)
+                db_file = temp_file
+
+            if problems := check(db_file, self.full):
+                self.signals.errored.emit(
+                    f"'{self.path}' is damaged:\n" + "\n".join(problems[:10])
+                )
+            else:
+                self.signals.done.emit(f"'{self.path}' is ok")
+
+        except Exception as e:
+            self.signals.errored.emit(str(e))
+
+        finally:
+            if temp_file:
+                os.remove(temp_file)
+
+
+class RestoreWorker(QRunnable):
+    """
+    replace the database `dest` with a verified backup, through the online
+    backup API in a child process; every connection to `dest` is closed first
+    """
+
+    __slots__ = ("path", "dest", "signals")
+
+    def __init__(self, path: str, dest: str):
+        super().__init__()
+        self.setAutoDelete(True)
+
+        self.path = path
+        self.dest = dest
+
+        self.signals = FileTransferSignals()
+
+    def _progress(self, remaining: int, total: int):
+        if total:
+            self.signals.progress.emit(100 * (total - remaining) // total)
+
+    def run(self):
+        start = time.perf_counter()
+        db_file, temp_file = self.path, None
+        try:
+            if isCompressed(self.path):
+                # next to dest; likely the same disk and plenty of space
+                fd, temp_file = tempfile.mkstemp(
+                    suffix=".sqlite", dir=os.path.dirname(self.dest)
+                )
+                os.close(fd)
+                decompress(self.path, temp_file)
+                db_file = temp_file
+
+            if problems := check(db_file):
+                self.signals.errored.emit(
+                    f"'{self.path}' is damaged, not restored:\n"
+                    + "\n".join(problems[:10])
+                )
+                return
+
+            runChild("restore", db_file, self.dest, progress=self._progress)
+
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(db_file) / (1024 * 1024)
+            self.signals.done.emit(
+                f"'{self.path}' restored: {size:.1f} MB in {elapsed:.1f} s "
+                f"({size / max(elapsed, 1e-6):.1f} MB/s)"
+            )
+
+        except Exception as e:
+            self.signals.errored.emit(str(e))
+
+        finally:
+            if temp_file:
+                os.remove(temp_file)
+
+
+class ScheduledBackupWorker(QRunnable):
+    """
+    time-stamped, compressed snapshot, made by a child process and followed by
+    rotation; `backedUp` asks for it to be logged as the base of later changesets
+    """
+
+    __slots__ = ("dest_dir", "compression", "keep_daily", "keep_weekly", "signals")
+
+    def __init__(
+        self,
+        src: str,
+        dest_dir: str,
+        compression: str,
+        keep_daily: int,
+        keep_weekly: int,
+    ):
+        super().__init__()
+        self.setAutoDelete(True)
+
+        self.src = src
+        self.dest_dir = dest_dir
+        self.compression = compression
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+
+        self.signals = FileTransferSignals()
+
+    def run(self):
+        name, _ = os.path.splitext(os.path.basename(self.src))
+        _, ext = COMPRESSORS[self.compression]
+        stamp = datetime.now().strftime(STAMP_FORMAT)
+        dest_file = os.path.join(self.dest_dir, f"{name}-{stamp}.sqlite{ext}")
+        part_file = f"{dest_file}.part"
+
+        fd, snapshot_file = tempfile.mkstemp(suffix=".sqlite", dir=self.dest_dir)
+        os.close(fd)
+        try:
+            runChild("snapshot", self.src, snapshot_file)
+            # logged before compressing; the compressed copy cannot be opened
+            seq = markSnapshot(snapshot_file, dest_file)
+            compress(snapshot_file, part_file, self.compression)
+            os.replace(part_file, dest_file)
+            self.signals.backedUp.emit("full", dest_file, seq)
+            rotate(self.dest_dir, name, self.keep_daily, self.keep_weekly)
+            self.signals.done.emit(f"'{self.src}' backed up to '{dest_file}'")
+
+        except Exception as e:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+            self.signals.errored.emit(str(e))
+
+        finally:
+            os.remove(snapshot_file)
+
+
+class BackupScheduler(QObject):
+    """
+    backs the database of `worker` up every interval, once the user has been
+    idle, on the thread pool; `worker` logs the backups in the database
+    """
+
+    def __init__(self, worker, dest_dir: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.src = worker.path
+        self._worker = worker
+        self.dest_dir = dest_dir
+        self.compression = "gzip"
+        self.keep_daily = 7
+        self.keep_weekly = 4
+
+        self._interval = 0
+        """secs between backups"""
+        self._last_input = time.monotonic()
+        self._running = False
+        self._paused = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._onDue)
+
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() in INPUT_EVENTS:
+            self._last_input = time.monotonic()
+        return False
+
+    def setInterval(self, hours: float):
+        """set the time between backups; 0 stops them"""
+        self._interval = hours * 3600
+        self._arm()
+
+    def setRotation(self, keep_daily: int, keep_weekly: int):
+        """set how many daily and weekly backups to keep"""
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+
+    def setPaused(self, paused: bool):
+        """
+        hold backups while a restore replaces the database; a backup that
+        finishes meanwhile is of the replaced database and is not logged
+        """
+        self._paused = paused
+        self._arm()
+
+    def setCompression(self, compression: str):
+        """gzip or lzma"""
+        if compression in COMPRESSORS:
+            self.compression = compression
+        else:
+            logger.error(f"Unknown backup compression '{compression}'")
+
+    def _arm(self, secs: float | None = None):
+        if self._paused or not self._interval:
+            self._timer.stop()
+            return
+
+        if secs is None:
+            name, _ = os.path.splitext(os.path.basename(self.src))
+            backups = scheduledBackups(self.dest_dir, name)
+            last = backups[0][0] if backups else datetime.min
+            elapsed = (datetime.now() - last).total_seconds()
+            secs = max(self._interval - elapsed, 0)
+
+        self._timer.start(int(secs * 1000))
+
+    def _onDue(self):
+        idle = time.monotonic() - self._last_input
+        if self._running or idle < IDLE_SECS:
+            # try again once the user could have gone idle
+            self._arm(IDLE_SECS - idle if not self._running else IDLE_SECS)
+            return
+
+        worker = ScheduledBackupWorker(
+            self.src,
+            self.dest_dir,
+            self.compression,
+            self.keep_daily,
+            self.keep_weekly,
+        )
+        worker.signals.backedUp.connect(self._onBackedUp)
+        worker.signals.done.connect(self._onDone)
+        worker.signals.errored.connect(self._onErrored)
+
+        self._running = True
+        threadpool_manager.start(worker)
+        logger.info("Scheduled database backup initiated")
+
+    def _onBackedUp(self, kind: str, path: str, seq: int):
+        if self._paused:
+            logger.warning(f"Backup '{path}' not logged; the database was replaced")
+            return
+        # the base of later incremental backups; the change log is pruned
+        job = self._worker.submit(commitBackup, kind, path, seq, write=True)
+        job.failed.connect(
+            lambda err: logger.error(f"Scheduled backup was not logged: {err}")
+        )
+
+    def _onDone(self, info: str):
+        self._running = False
+        logger.info(info)
+        self._arm()
+
+    def _onErrored(self, err: str):
+        self._running = False
+        logger.error(f"Scheduled backup failed: {err}")
+        # don't retry in a tight loop
+        self._arm(self._interval)
+
+
 threadpool_manager = QThreadPool()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="back the app's database up")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("snapshot", help="copy a live database")
+    command.add_argument("src")
+    command.add_argument("dest")
+
+    command = commands.add_parser(
+        "restore", help="copy a backup over a database nothing has open"
+    )
+    command.add_argument("src")
+    command.add_argument("dest")
+
+    command = commands.add_parser(
+        "replay", help="apply changesets to the full snapshot they follow"
+    )
+    command.add_argument("snapshot")
+    command.add_argument("changesets", nargs="+")
+
+    args = parser.parse_args(argv)
+    try:
+        match args.command:
+            case "snapshot" | "restore":
+                # a line per step, read by runChild
+                (snapshot if args.command == "snapshot" else restore)(
+                    args.src,
+                    args.dest,
+                    lambda remaining, total: print(remaining, total, flush=True),
+                )
+            case "replay":
+                replay(args.snapshot, args.changesets)
+    except Exception as e:
+        sys.exit(str(e) or type(e).__name__)
+
+
+if __name__ == "__main__":
+    main()
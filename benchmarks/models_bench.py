@@ -0,0 +1,294 @@
+"""
+time the model layer against generated databases, headless;
+run from the repo root: python -m benchmarks.models_bench --output results.json
+"""
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+from database import openDatabase
+from migrations import migrate
+from search import SearchIndex
+from models import NotesModel, TopicsModel, ProblemsModel, SearchableModel
+from db_populator import vocabulary
+from constants import DEFAULT_SETTINGS
+
+
+logger = logging.getLogger(__name__)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(tempfile.gettempdir(), "task-tracker-bench")
+"""generated databases, reused between runs"""
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+"""notes per database"""
+
+
+def dataset(notes: int, seed: int):
+    """path of a generated database with `notes` notes, generating it if needed"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"notes-{notes}-seed{seed}.sqlite")
+    if not os.path.exists(path):
+        # a separate process keeps the generator's pool away from Qt
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.join(REPO_DIR, "db_populator.py"),
+                f"--db={path}.part",
+                f"--topics={max(20, notes // 200)}",
+                f"--notes={notes}",
+                f"--problems={max(10, notes // 20)}",
+                f"--seed={seed}",
+            ],
+            cwd=REPO_DIR,
+            check=True,
+        )
+        os.replace(f"{path}.part", path)
+    return path
+
+
+def timeit(fn, repeat: int, setup=None):
+    """seconds of each of `repeat` calls to fn, after calling setup"""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+    }
+
+
+def newestIds(db_path: str, table: str, count: int):
+    with sqlite3.connect(db_path) as conn:
+        return [
+            row[0]
+            for row in conn.execute(
+                f"SELECT id FROM {table} ORDER BY id DESC LIMIT ?", (count,)
+            )
+        ]
+
+
+def fetchPages(model: NotesModel, pages: int):
+    model.select()
+    for _ in range(pages):
+        model.fetchMore()
+    # read the last row, as a view would
+    model.index(model.rowCount() - 1, 3).data()
+
+
+def benchSize(notes: int, seed: int, repeat: int):
+    """results of every benchmark on a fresh copy of the `notes` dataset"""
+    source = dataset(notes, seed)
+    fd, path = tempfile.mkstemp(suffix=".sqlite", dir=DATA_DIR)
+    os.close(fd)
+    shutil.copyfile(source, path)
+
+    db = openDatabase(path, DEFAULT_SETTINGS["db_profile"], name=f"bench-{notes}")
+    migrate(db)
+    results = {}
+    try:
+        # first open of a generated database builds the full-text index
+        built = []
+        results["search.build_index"] = timeit(
+            lambda: built.append(SearchIndex(db)), 1
+        )
+        index = built[0]
+
+        topics = TopicsModel(db)
+        problems = ProblemsModel(db)
+        notes_model = NotesModel(db)
+        word = vocabulary(seed)[0]
+
+        results["topics.getTopics"] = timeit(topics.getTopics, repeat, topics.select)
+        results["problems.getProblems"] = timeit(
+            problems.getProblems, repeat, problems.select
+        )
+        results["notes.select"] = timeit(lambda: fetchPages(notes_model, 1), repeat)
+        results["notes.scroll_20_pages"] = timeit(
+            lambda: fetchPages(notes_model, 20), repeat
+        )
+
+        topic_id = topics.getTopics()[0].topic_id
+        results["notes.newNote_x100"] = timeit(
+            lambda: [
+                notes_model.newNote("2026-01-01 00:00:00", topic_id, f"note {i}")
+                for i in range(100)
+            ],
+            repeat,
+            lambda: fetchPages(notes_model, 1),
+        )
+
+        # leave rows for every repeat to delete
+        ids = []
+        count = min(1000, notes // (2 * repeat))
+        results["notes.deleteIds"] = timeit(
+            lambda: notes_model.deleteIds(ids),
+            repeat,
+            lambda: ids.__setitem__(slice(None), newestIds(path, "notes", count)),
+        )
+        results["notes.deleteIds"]["rows"] = count
+
+        problem_ids = []
+        count = min(100, problems.rowCount() // (2 * repeat))
+        results["problems.deleteIds"] = timeit(
+            lambda: problems.deleteIds(problem_ids),
+            repeat,
+            lambda: problem_ids.__setitem__(
+                slice(None), newestIds(path, "problems", count)
+            ),
+        )
+        results["problems.deleteIds"]["rows"] = count
+
+        notes_proxy = SearchableModel()
+        notes_proxy.setSourceModel(notes_model)
+        notes_proxy.setSearchIndex(index, "notes")
+        results["search.notes"] = timeit(
+            lambda: (
+                notes_proxy.search(word),
+                notes_proxy.index(notes_proxy.rowCount() - 1, 3).data(),
+            ),
+            repeat,
+            lambda: notes_proxy.search(""),
+        )
+
+        problems_proxy = SearchableModel()
+        problems_proxy.setSourceModel(problems)
+        problems_proxy.setSearchIndex(index, "problems")
+        results["search.problems"] = timeit(
+            lambda: problems_proxy.search(word),
+            repeat,
+            lambda: problems_proxy.search(""),
+        )
+
+        # no index; the proxy filters every row itself
+        filter_proxy = SearchableModel()
+        filter_proxy.setSourceModel(problems)
+        results["filter.problems"] = timeit(
+            lambda: filter_proxy.search(word),
+            repeat,
+            lambda: filter_proxy.search(""),
+        )
+
+    finally:
+        db.close()
+        os.remove(path)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, noise: float):
+    """
+    print median changes against baseline; True if nothing got slower
+    by more than `tolerance` and `noise` seconds
+    """
+    ok = True
+    print(f"{'benchmark':<36}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for size, benches in results["results"].items():
+        for name, stats in benches.items():
+            base = baseline["results"].get(size, {}).get(name)
+            if not base:
+                continue
+            ratio = stats["median"] / base["median"] if base["median"] else 1
+            slower = (
+                ratio > 1 + tolerance and stats["median"] - base["median"] > noise
+            )
+            ok = ok and not slower
+            print(
+                f"{name + ' @' + size:<36}{base['median'] * 1000:>10.2f}ms"
+                f"{stats['median'] * 1000:>10.2f}ms{ratio:>7.2f}x"
+                + ("  SLOWER" if slower else "")
+            )
+    return ok
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="fraction a median may grow before it counts as a regression",
+    )
+    parser.add_argument(
+        "--noise",
+        type=float,
+        default=0.0005,
+        help="seconds a median may grow by, whatever the fraction",
+    )
+    args = parser.parse_args(argv)
+
+    # the models log every write
+    logging.basicConfig(level=logging.WARNING)
+
+    results = {"meta": metadata(), "results": {}}
+    for size in args.sizes:
+        print(f"benchmarking {size} notes", file=sys.stderr)
+        results["results"][str(size)] = benchSize(size, args.seed, args.repeat)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if not compare(results, baseline, args.tolerance, args.noise):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
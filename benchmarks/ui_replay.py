@@ -0,0 +1,255 @@
+"""
+replay scripted UI actions on the Tracker, headless, and report their latency;
+run from the repo root: python -m benchmarks.ui_replay --output ui.json
+"""
+
+import os
+import sys
+import json
+import math
+import shutil
+import logging
+import argparse
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import Qt, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtTest import QTest
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+from main import Tracker
+from journal import JOURNAL_SUFFIX, FAILED_SUFFIX
+from db_populator import vocabulary
+from benchmarks.models_bench import DATA_DIR, dataset, metadata
+
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_MS = 2
+"""interval of the timer whose late ticks measure event loop stalls"""
+PAUSE_MS = 20
+"""idle time between actions"""
+
+DEFAULT_SCRIPT = [
+    {"action": "show_entries"},
+    {"action": "type", "table": "notes", "text": "{word} {word2}"},
+    {"action": "clear_search", "table": "notes"},
+    {"action": "scroll", "table": "notes", "pages": 5},
+    {"action": "show_settings"},
+    {"action": "type", "table": "problems", "text": "{word}"},
+    {"action": "clear_search", "table": "problems"},
+    {"action": "toggle_solved", "row": 0},
+    {"action": "toggle_solved", "row": 0},
+    {"action": "type", "table": "topics", "text": "{word2}"},
+    {"action": "clear_search", "table": "topics"},
+    {"action": "submit_note", "text": "replayed note about {word}"},
+]
+"""
+actions replayed when no script is given; {word}s come from the dataset,
+`type` is replayed as one `key` action per character
+"""
+
+
+def percentile(values: list[float], p: float):
+    """nearest-rank percentile"""
+    ranked = sorted(values)
+    return ranked[max(0, math.ceil(p / 100 * len(ranked)) - 1)]
+
+
+class Replayer(QObject):
+    """
+    runs one action per event loop turn and times it until the loop is idle again;
+    a heartbeat timer ticking late measures how long the loop was blocked
+    """
+
+    def __init__(self, tracker: Tracker, script: list[dict], words: dict, **kwargs):
+        super().__init__(**kwargs)
+
+        self.tracker = tracker
+        self.words = words
+        self.script = list(self._expand(script))
+        self.samples: list[dict] = []
+
+        self._step = 0
+        self._start = 0.0
+        self._stall = 0.0
+        """longest heartbeat delay during the current action"""
+        self._last_tick = time.perf_counter()
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setTimerType(Qt.TimerType.PreciseTimer)
+        self._heartbeat.timeout.connect(self._onTick)
+
+    def _expand(self, script: list[dict]):
+        for action in script:
+            if action["action"] == "type":
+                for key in self._text(action):
+                    yield {"action": "key", "table": action["table"], "key": key}
+            else:
+                yield action
+
+    def tables(self):
+        gui = self.tracker.gui
+        return {
+            "notes": gui.notesview.table_group,
+            "topics": gui.settingsview.topic_options,
+            "problems": gui.settingsview.problem_options,
+        }
+
+    def run(self):
+        """replay the script; returns when it is done"""
+        self._heartbeat.start(HEARTBEAT_MS)
+        QTimer.singleShot(PAUSE_MS, self._next)
+        app.exec()
+        self._heartbeat.stop()
+
+    def _onTick(self):
+        now = time.perf_counter()
+        self._stall = max(self._stall, now - self._last_tick - HEARTBEAT_MS / 1000)
+        self._last_tick = now
+
+    def _next(self):
+        if self._step == len(self.script):
+            app.quit()
+            return
+
+        action = self.script[self._step]
+        self._step += 1
+
+        self._stall = 0.0
+        self._start = time.perf_counter()
+        getattr(self, f"_{action['action']}")(action)
+        # runs once the events the action posted are handled
+        QTimer.singleShot(0, lambda: self._settled(action))
+
+    def _settled(self, action: dict):
+        wall = time.perf_counter() - self._start
+        # the tick after the action shows how long it held the loop
+        self._onTick()
+        self.samples.append(
+            {"action": action["action"], "wall": wall, "stall": max(self._stall, 0)}
+        )
+        QTimer.singleShot(PAUSE_MS, self._next)
+
+    def _text(self, action: dict):
+        return action["text"].format(**self.words)
+
+    # actions
+
+    def _show_entries(self, action: dict):
+        self.tracker.showEntries()
+
+    def _show_settings(self, action: dict):
+        self.tracker.gui.switchToSettings()
+
+    def _key(self, action: dict):
+        """a key typed into the search box"""
+        QTest.keyClicks(self.tables()[action["table"]].search, action["key"])
+
+    def _clear_search(self, action: dict):
+        self.tables()[action["table"]].search.clear()
+
+    def _scroll(self, action: dict):
+        view = self.tables()[action["table"]].table_view
+        for _ in range(action.get("pages", 1)):
+            view.verticalScrollBar().setValue(view.verticalScrollBar().maximum())
+
+    def _toggle_solved(self, action: dict):
+        problems = self.tables()["problems"]
+        problems.table_view.selectRow(action.get("row", 0))
+        problems.solvedproblem.click()
+
+    def _submit_note(self, action: dict):
+        popup = self.tracker.input_window
+        topics = popup.topics.child
+        if not topics.count():
+            # no topic runs at this time of day; log under any topic
+            topics.addItems(t.title for t in self.tracker.timeline.topics[:1])
+        popup.notes.child.setPlainText(self._text(action))
+        popup.submit.click()
+
+
+def report(samples: list[dict]):
+    """p50/p95/p99 of wall time and stall, in msecs, per action"""
+    actions = {}
+    for sample in samples:
+        actions.setdefault(sample["action"], []).append(sample)
+
+    summary = {}
+    for name, group in actions.items():
+        summary[name] = {"count": len(group)}
+        for metric in ("wall", "stall"):
+            values = [s[metric] * 1000 for s in group]
+            for p in (50, 95, 99):
+                summary[name][f"{metric}_p{p}"] = percentile(values, p)
+    return summary
+
+
+def printSummary(summary: dict):
+    columns = [f"{m}_p{p}" for m in ("wall", "stall") for p in (50, 95, 99)]
+    print(f"{'action':<16}{'count':>6}" + "".join(f"{c:>12}" for c in columns))
+    for name, stats in summary.items():
+        print(
+            f"{name:<16}{stats['count']:>6}"
+            + "".join(f"{stats[c]:>10.1f}ms" for c in columns)
+        )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=10_000, help="dataset size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", help="JSON list of actions; see DEFAULT_SCRIPT")
+    parser.add_argument("--repeat", type=int, default=5, help="times to replay")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # main configures logging for the app
+    logging.getLogger().setLevel(logging.WARNING)
+
+    script = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script) as file:
+            script = json.load(file)
+
+    words = vocabulary(args.seed)
+    source = dataset(args.notes, args.seed)
+    fd, path = tempfile.mkstemp(suffix=".sqlite", dir=DATA_DIR)
+    os.close(fd)
+    shutil.copyfile(source, path)
+    # never the app's backups
+    backup_dir = tempfile.mkdtemp(dir=DATA_DIR)
+    try:
+        tracker = Tracker(path, backup_dir)
+        # a backup would skew the timings
+        tracker.backup_scheduler.setInterval(0)
+        replayer = Replayer(
+            tracker, script * args.repeat, {"word": words[0], "word2": words[1]}
+        )
+        replayer.run()
+        tracker.db.close()
+    finally:
+        for suffix in ("", "-wal", "-shm", JOURNAL_SUFFIX, FAILED_SUFFIX):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        shutil.rmtree(backup_dir)
+
+    summary = report(replayer.samples)
+    results = {
+        "meta": {**metadata(), "notes": args.notes, "repeat": args.repeat},
+        "summary": summary,
+        "samples": replayer.samples,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    printSummary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,9 @@ os.makedirs(DB_DIR, exist_ok=True)
 
 APP_DB = os.path.join(DB_DIR, "app.sqlite")
 
+BACKUP_DIR = os.path.join(APP_DIR, "backups")
+os.makedirs(BACKUP_DIR, exist_ok=True)
+
 APP_ICON = os.path.join(APP_DIR, "icons", "appicon_large.png")
 
 if isDarkMode():
@@ -54,4 +57,20 @@ DEFAULT_SETTINGS = {
     "notify_units": "minutes",
     "disable_saturday": False,
     "disable_sunday": False,
+    # SQLite pragmas applied when the database is opened
+    "db_profile": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        # negative is KiB
+        "cache_size": -32000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "foreign_keys": True,
+    },
+    # automatic backups to BACKUP_DIR; 0 hours disables them
+    "backup_interval_hours": 24,
+    "backup_keep_daily": 7,
+    "backup_keep_weekly": 4,
+    # gzip or lzma
+    "backup_compression": "gzip",
 }
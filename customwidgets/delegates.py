@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (
     QTimeEdit,
 )
 from PyQt6.QtCore import Qt, QRect, QModelIndex, QTime
+from datastructures.registry import Registry
 
 
 logger = logging.getLogger(__name__)
@@ -30,27 +31,30 @@ class NotesDelegate(QStyledItemDelegate):
         self.note_col = 3
         # topics
         self._topics = []
+        self._registry: Registry | None = None
 
     def setTopics(self, topics: list):
         """update topics list"""
         self._topics = topics
         logger.info(f"Notes topics updated")
 
+    def setRegistry(self, registry: Registry):
+        """set the topics id/title lookups"""
+        self._registry = registry
+
     def topicID(self, title: str):
         """get topic id from title"""
-        for tpc in self._topics:
-            if tpc.title == title:
-                logger.info(f"Found topic ID for {title!r}")
-                return tpc.topic_id
+        if self._registry and (topic_id := self._registry.id(title)) is not None:
+            logger.info(f"Found topic ID for {title!r}")
+            return topic_id
 
         logger.info(f"Not Found: topic ID for {title!r}")
 
     def topicTitle(self, topic_id: int):
         """get topic title from id"""
-        for tpc in self._topics:
-            if tpc.topic_id == topic_id:
-                logger.info(f"Found topic title of ID {topic_id}")
-                return tpc.title
+        if self._registry and (title := self._registry.title(topic_id)) is not None:
+            logger.info(f"Found topic title of ID {topic_id}")
+            return title
 
         logger.info(f"Not Found: topic title of ID {topic_id}")
 
@@ -226,18 +230,22 @@ class ProblemsDelegate(QStyledItemDelegate):
         self.topics_col = 3
         # topics
         self._topics = []
+        self._registry: Registry | None = None
 
     def setTopics(self, topics: list):
         """update topics list"""
         self._topics = topics
         logger.info(f"Problems topics updated")
 
+    def setRegistry(self, registry: Registry):
+        """set the topics id/title lookups"""
+        self._registry = registry
+
     def topicID(self, title: str):
         """get topic id from title"""
-        for tpc in self._topics:
-            if tpc.title == title:
-                logger.info(f"Found topic ID for {title!r}")
-                return tpc.topic_id
+        if self._registry and (topic_id := self._registry.id(title)) is not None:
+            logger.info(f"Found topic ID for {title!r}")
+            return topic_id
 
         logger.info(f"Not Found: topic ID for {title!r}")
 
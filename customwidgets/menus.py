@@ -168,6 +168,15 @@ class TableMoreMenu(QMenu):
 
         self.show_file = QAction(QIcon(SHOW_FILE_ICON), "Database Location")
         self.backup_file = QAction(QIcon(BACKUP_ICON), "Backup Database")
+        self.incremental_backup = QAction(
+            QIcon(BACKUP_ICON), "Backup Changes Since Last Backup"
+        )
+        self.verify_backup = QAction(QIcon(BACKUP_ICON), "Verify Backup")
+        self.restore_backup = QAction(QIcon(BACKUP_ICON), "Restore Backup")
 
         self.addAction(self.show_file)
         self.addAction(self.backup_file)
+        self.addAction(self.incremental_backup)
+        self.addSeparator()
+        self.addAction(self.verify_backup)
+        self.addAction(self.restore_backup)
@@ -8,25 +8,42 @@ from PyQt6.QtWidgets import (
     QTableView,
     QFileDialog,
     QMessageBox,
+    QProgressDialog,
     QVBoxLayout,
     QHBoxLayout,
 )
 from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import Qt, pyqtSignal
 from customwidgets.tableviews import NotesTable, TopicsTable, ProblemsTable
 from customwidgets.lineedits import SearchInput
 from customwidgets.buttons import InOutButton
 from customwidgets.menus import TableMoreMenu
 from utils import open_folder_in_explorer
 from models import SearchableModel
-from backup import FileCopyWorker, threadpool_manager
+from backup import (
+    BackupWorker,
+    IncrementalBackupWorker,
+    VerifyWorker,
+    RestoreWorker,
+    commitBackup,
+    threadpool_manager,
+)
 from constants import DELETE_ICON, APP_DB, MORE_ICON
 
 logger = logging.getLogger(__name__)
 
+PROGRESS_DELAY_MS = 500
+"""backups that finish sooner show no progress dialog"""
+
 
 class SearchableTable(QGroupBox):
     """base searchable table class"""
 
+    restoreStarting = pyqtSignal()
+    """emitted before a backup replaces the database; connections must close"""
+    restoreFinished = pyqtSignal()
+    """emitted once a restore finished, whether or not it replaced the database"""
+
     def __init__(self, name: str, **kwargs):
         super().__init__(name, **kwargs)
 
@@ -44,6 +61,9 @@ class SearchableTable(QGroupBox):
 
         self.last_known_dir = os.path.expanduser(f"~{os.sep}Documents")
 
+        self.db_worker = None
+        """logs backups in the database; set by setDatabaseWorker"""
+
         self.model = SearchableModel()
 
         self.table_view: QTableView = tables[name]()  # create table instance
@@ -55,6 +75,9 @@ class SearchableTable(QGroupBox):
         self.more_menu = TableMoreMenu(self)
         self.more_menu.show_file.triggered.connect(self._open_source)
         self.more_menu.backup_file.triggered.connect(self._backup)
+        self.more_menu.incremental_backup.triggered.connect(self._incrementalBackup)
+        self.more_menu.verify_backup.triggered.connect(self._verifyBackup)
+        self.more_menu.restore_backup.triggered.connect(self._restoreBackup)
 
         # create btns
         self._create_btns()
@@ -75,7 +98,7 @@ class SearchableTable(QGroupBox):
         """create default btns/widgets"""
 
         self.search = SearchInput()
-        self.search.textChanged.connect(self.model.setFilterFixedString)
+        self.search.textChanged.connect(self.model.search)
 
         self.more_btn = QPushButton()
         self.more_btn.setIcon(QIcon(MORE_ICON))
@@ -99,8 +122,8 @@ class SearchableTable(QGroupBox):
         open_folder_in_explorer(os.path.dirname(APP_DB))
         logger.info("Database file location opened")
 
-    def _backup(self):
-        """copy database file to chosen location"""
+    def _backupDir(self):
+        """ask for a backup folder; None if cancelled"""
         backup_dir = os.path.normpath(
             QFileDialog.getExistingDirectory(
                 self,
@@ -110,15 +133,103 @@ class SearchableTable(QGroupBox):
         )
         if backup_dir != ".":
             self.last_known_dir = backup_dir
+            return backup_dir
 
-            worker = FileCopyWorker(APP_DB, backup_dir)
-            worker.signals.done.connect(self._show_info)
-            worker.signals.errored.connect(self._show_error)
+    def _progressDialog(self, label: str, steps: bool, modal: bool):
+        """
+        dialog shown while a worker runs; a busy indicator if the worker
+        reports no `steps`, shown at once and blocking the app if `modal`
+        """
+        dialog = QProgressDialog(label, None, 0, 100 if steps else 0, self)
+        dialog.setWindowTitle("Backup")
+        if modal:
+            dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+            dialog.setMinimumDuration(0)
+        else:
+            dialog.setWindowModality(Qt.WindowModality.NonModal)
+            dialog.setMinimumDuration(PROGRESS_DELAY_MS)
+        dialog.setValue(0)
+        return dialog
 
-            threadpool_manager.start(worker)
+    def _startBackup(
+        self, worker, label: str, steps: bool = False, modal: bool = False
+    ):
+        # slots of the dialog run on the GUI thread; signals come from the pool
+        dialog = self._progressDialog(label, steps, modal)
+        worker.signals.progress.connect(dialog.setValue)
+        for signal in (worker.signals.done, worker.signals.errored):
+            signal.connect(dialog.reset)
+            signal.connect(dialog.deleteLater)
 
+        worker.signals.backedUp.connect(self._commitBackup)
+        worker.signals.done.connect(self._show_info)
+        worker.signals.errored.connect(self._show_error)
+
+        threadpool_manager.start(worker)
+
+    def _commitBackup(self, kind: str, path: str, seq: int):
+        """log a finished backup through the database worker"""
+        job = self.db_worker.submit(commitBackup, kind, path, seq, write=True)
+        job.failed.connect(self._show_error)
+
+    def _backup(self):
+        """copy database file to chosen location"""
+        if backup_dir := self._backupDir():
+            self._startBackup(
+                BackupWorker(self.db_worker.path, backup_dir),
+                "Backing up the database...",
+                True,
+            )
             logger.info("Database backup initiated")
 
+    def _incrementalBackup(self):
+        """save the changes since the last backup to chosen location"""
+        if backup_dir := self._backupDir():
+            self._startBackup(
+                IncrementalBackupWorker(self.db_worker.path, backup_dir),
+                "Saving the changes...",
+            )
+            logger.info("Incremental database backup initiated")
+
+    def _backupFile(self, caption: str):
+        """ask for a backup file; None if cancelled"""
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            caption,
+            self.last_known_dir,
+            "Backups (*.sqlite *.sqlite.gz *.sqlite.xz)",
+        )
+        if path:
+            self.last_known_dir = os.path.dirname(path)
+            return os.path.normpath(path)
+
+    def _verifyBackup(self):
+        """check a chosen backup for damage"""
+        if path := self._backupFile("Choose Backup to Verify"):
+            self._startBackup(VerifyWorker(path, full=True), "Verifying the backup...")
+            logger.info(f"Verifying backup '{path}'")
+
+    def _restoreBackup(self):
+        """replace the database with a chosen backup"""
+        path = self._backupFile("Choose Backup to Restore")
+        if not path:
+            return
+
+        answer = QMessageBox.question(
+            self,
+            "Restore Backup",
+            f"Replace all notes, topics and problems with '{path}'?",
+        )
+        if answer == QMessageBox.StandardButton.Yes:
+            worker = RestoreWorker(path, self.db_worker.path)
+            # the database is reopened even if the restore failed
+            worker.signals.done.connect(self.restoreFinished)
+            worker.signals.errored.connect(self.restoreFinished)
+            # nothing may use the database until it is reopened
+            self.restoreStarting.emit()
+            self._startBackup(worker, "Restoring the backup...", True, modal=True)
+            logger.info(f"Restoring backup '{path}'")
+
     def _show_info(self, info: str):
         """show info message box"""
         QMessageBox.information(
@@ -142,6 +253,14 @@ class SearchableTable(QGroupBox):
             for idx in self.table_view.selectionModel().selectedRows()
         }
 
+    def setDatabaseWorker(self, worker):
+        """back up, and log backups in, the database of `worker`"""
+        self.db_worker = worker
+
+    def setSearchIndex(self, index, table: str):
+        """search `table` through the full-text index"""
+        self.model.setSearchIndex(index, table)
+
     def setModel(self, model):
         """add source model for the proxy model"""
 
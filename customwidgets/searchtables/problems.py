@@ -57,7 +57,10 @@ class ProblemsTableview(SearchableTable):
 
     def setCheckState(self, selected):
         """check or uncheck problem based on database data"""
-        states = (idx.model().record(idx.row()).value("solved") for idx in selected)
+        states = (
+            idx.model().index(idx.row(), idx.model().fieldIndex("solved")).data()
+            for idx in selected
+        )
 
         enabled = all(states)
 
@@ -70,23 +73,10 @@ class ProblemsTableview(SearchableTable):
 
             if smodel := self.table_view.model():
                 model = smodel.sourceModel()
-                for index in selected:
-                    col = model.fieldIndex("solved")
-                    row = index.row()
-
-                    if model.setData(model.index(row, col), int(checked)):
-                        if model.submitAll():
-                            logger.info(f"Problem was solved: {checked}")
-                        else:
-                            logger.error(
-                                f"Problem error: submitAll: {model.lastError().text()}"
-                            )
-                    else:
-                        logger.error(
-                            f"Problem error: setData: {model.lastError().text()}"
-                        )
+                ids = model.rowIds(index.row() for index in selected)
 
-                model.select()
+                if model.setSolved(ids, checked):
+                    logger.info(f"{len(ids)} problems solved: {checked}")
 
     def _on_delete(self):
         """delete selected rows"""
@@ -109,12 +99,7 @@ class ProblemsTableview(SearchableTable):
                     self.del_btn.hide()
                     model = smodel.sourceModel()
 
-                    for index in selected:
-                        row = index.row()
-                        model.deleteRowFromTable(row)
-                        logger.info(f"Deleted problem at row {row}")
-
-                    if model.select():
+                    if model.deleteRows(index.row() for index in selected):
                         logger.info(
                             "Delete changes in problems table have been submitted"
                         )
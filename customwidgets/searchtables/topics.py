@@ -50,24 +50,10 @@ class TopicsTableview(SearchableTable):
             checked = self.enabledtopic.isChecked()
             if smodel := self.table_view.model():
                 model = smodel.sourceModel()
+                ids = model.rowIds(index.row() for index in selected_rows)
 
-                for index in selected_rows:
-                    col = model.fieldIndex("enabled")
-                    row = index.row()
-
-                    if model.setData(model.index(row, col), int(checked)):
-                        if model.submitAll():
-                            logger.info(f"Topic was enabled: {checked}")
-                        else:
-                            logger.error(
-                                f"Topic error: submitAll: {model.lastError().text()}"
-                            )
-                    else:
-                        logger.error(
-                            f"Topic error: setData: {model.lastError().text()}"
-                        )
-
-                model.select()
+                if model.setEnabled(ids, checked):
+                    logger.info(f"{len(ids)} topics enabled: {checked}")
 
     def disableDnCheck(self):
         """disable btns"""
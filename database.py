@@ -0,0 +1,50 @@
+"""SQLite connections"""
+
+import logging
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+
+logger = logging.getLogger(__name__)
+
+PRAGMAS = (
+    # journal mode first; the others may depend on it
+    "journal_mode",
+    "synchronous",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "foreign_keys",
+)
+"""pragmas a connection profile can set"""
+
+
+def applyProfile(db: QSqlDatabase, profile: dict):
+    """set the connection pragmas in `profile`"""
+    query = QSqlQuery(db=db)
+    for name in PRAGMAS:
+        if name not in profile:
+            continue
+
+        value = profile[name]
+        if isinstance(value, bool):
+            value = "ON" if value else "OFF"
+        elif not isinstance(value, int):
+            value = str(value).upper()
+
+        if query.exec(f"PRAGMA {name} = {value}"):
+            logger.info(f"PRAGMA {name} = {value}")
+        else:
+            logger.error(f"PRAGMA {name} failed: {query.lastError().text()}")
+
+
+def openDatabase(path: str, profile: dict, name: str = ""):
+    """open the SQLite file at `path` as connection `name` and apply `profile`"""
+    if name:
+        db = QSqlDatabase.addDatabase("QSQLITE", name)
+    else:
+        db = QSqlDatabase.addDatabase("QSQLITE")
+    db.setDatabaseName(path)
+
+    if db.open():
+        applyProfile(db, profile)
+    return db
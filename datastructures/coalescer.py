@@ -0,0 +1,50 @@
+"""run a slot once for a burst of signals"""
+
+import logging
+from PyQt6.QtCore import QObject, QTimer
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeCoalescer(QObject):
+    """
+    collect signals emitted within one event loop turn and, once the turn is over,
+    call each slot they were connected to once, in the order they were watched
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._slots: list = []
+        """watched slots, in call order"""
+        self._pending: set[int] = set()
+        """indices in _slots to be called"""
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    def watch(self, signals, slot):
+        """call `slot`, without arguments, after any of `signals` is emitted"""
+        if slot not in self._slots:
+            self._slots.append(slot)
+        index = self._slots.index(slot)
+        for signal in signals:
+            signal.connect(lambda *args, index=index: self._mark(index))
+
+    def _mark(self, index: int):
+        self._pending.add(index)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """call the pending slots now"""
+        self._timer.stop()
+        pending, self._pending = self._pending, set()
+        if pending:
+            logger.debug(f"{len(pending)} coalesced refreshes")
+        # slots that emit a watched signal are marked again for the next turn
+        for index in sorted(pending):
+            self._slots[index]()
@@ -25,3 +25,16 @@ class ProblemData:
     problem: str
     topic_id: int
     solved: bool
+
+
+@dataclass(slots=True, kw_only=True)
+class ActivityData:
+    """writes of one submit; those left as None are skipped"""
+
+    timestamp: str
+    topic_id: int
+    note: str | None = None
+    problem: str | None = None
+    """new problem"""
+    solved_id: int | None = None
+    """problem marked as solved"""
@@ -0,0 +1,87 @@
+"""interval index over the daily topic time slots"""
+
+from bisect import bisect_right
+from dataclasses import replace
+from datetime import datetime, timedelta
+from datastructures.datas import TopicData
+
+DAY = 24 * 60 * 60
+"""seconds in a day"""
+
+
+def secondsOfDay(dt: datetime):
+    """seconds since midnight"""
+    return dt.hour * 3600 + dt.minute * 60 + dt.second + dt.microsecond / 1e6
+
+
+class TopicIntervals:
+    """
+    answers which topics cover a time of day, and which of them started
+    closest to it, with one bisect;
+    a topic covers [starts, ends), slots ending before they start wrap past midnight;
+    before its end, a wrapping topic is the one that started the night before
+    """
+
+    __slots__ = ("_bounds", "_covering", "_closest")
+
+    def __init__(self, topics: list[TopicData]):
+        # (second, is_start, topic) events for a sweep over the day
+        events = []
+        starts = {}
+        for topic in topics:
+            start, end = int(secondsOfDay(topic.starts)), int(secondsOfDay(topic.ends))
+            starts[topic.topic_id] = start
+            if start < end:
+                events += ((start, True, topic), (end, False, topic))
+            elif start > end:
+                # wraps past midnight; after midnight it is last night's topic
+                night_before = replace(
+                    topic,
+                    starts=topic.starts - timedelta(days=1),
+                    ends=topic.ends - timedelta(days=1),
+                )
+                events += (
+                    (start, True, topic),
+                    (0, True, night_before),
+                    (end, False, night_before),
+                )
+
+        self._bounds: list[int] = [0]
+        """sorted segment starts; segment i spans [bounds[i], bounds[i + 1])"""
+        self._covering: list[tuple[TopicData, ...]] = [()]
+        """topics covering each segment, ordered by start"""
+        self._closest: list[TopicData | None] = [None]
+        """covering topic that started most recently before each segment"""
+
+        active: dict[int, TopicData] = {}
+        events.sort(key=lambda e: e[0])
+        for second, is_start, topic in events:
+            if is_start:
+                active[topic.topic_id] = topic
+            else:
+                active.pop(topic.topic_id, None)
+
+            if second != self._bounds[-1]:
+                self._bounds.append(second)
+                self._covering.append(())
+                self._closest.append(None)
+
+            covering = sorted(active.values(), key=lambda t: starts[t.topic_id])
+            self._covering[-1] = tuple(covering)
+            self._closest[-1] = min(
+                covering,
+                # time since the topic started, counting back past midnight
+                key=lambda t: (second - starts[t.topic_id]) % DAY,
+                default=None,
+            )
+
+    def _segment(self, when: datetime):
+        return bisect_right(self._bounds, secondsOfDay(when)) - 1
+
+    def covering(self, when: datetime):
+        """topics running at `when`, ordered by start"""
+        return list(self._covering[self._segment(when)])
+
+    def closest(self, when: datetime):
+        """running topic whose start is closest to `when`"""
+        return self._closest[self._segment(when)]
@@ -0,0 +1,100 @@
+"""hash indexes over the rows of a table model"""
+
+from PyQt6.QtCore import QAbstractItemModel
+
+
+class Registry:
+    """
+    title->id, id->title and id->row lookups for a table model,
+    kept in step with the model's signals; column 0 is the id
+    """
+
+    __slots__ = ("_model", "_title_col", "_ids", "_titles", "_rows", "__weakref__")
+
+    def __init__(self, model: QAbstractItemModel, title_col: int):
+        self._model = model
+        self._title_col = title_col
+
+        self._ids: dict[str, int] = {}
+        """title -> id"""
+        self._titles: dict[int, str] = {}
+        """id -> title"""
+        self._rows: dict[int, int] = {}
+        """id -> row"""
+
+        model.modelReset.connect(self.rebuild)
+        model.rowsInserted.connect(self._onRowsInserted)
+        # rows below the removed ones shift up
+        model.rowsRemoved.connect(self.rebuild)
+        model.dataChanged.connect(self._onDataChanged)
+        # rows reordered in place; ids and titles are unchanged
+        model.layoutChanged.connect(self._onLayoutChanged)
+
+        self.rebuild()
+
+    def _index(self, first: int, last: int):
+        """(re)index rows first..last"""
+        for row in range(first, last + 1):
+            row_id = self._model.index(row, 0).data()
+            if not row_id:
+                # inserted row not written yet; indexed on dataChanged
+                continue
+            title = self._model.index(row, self._title_col).data()
+
+            old_title = self._titles.get(row_id)
+            if old_title is not None and self._ids.get(old_title) == row_id:
+                del self._ids[old_title]
+
+            self._ids[title] = row_id
+            self._titles[row_id] = title
+            self._rows[row_id] = row
+
+    def rebuild(self, *args):
+        """index every row, fetching any the model has not loaded yet"""
+        self._ids.clear()
+        self._titles.clear()
+        self._rows.clear()
+        if hasattr(self._model, "columnValues"):
+            # whole columns at once instead of a data() call per cell
+            ids = self._model.columnValues(0)
+            titles = self._model.columnValues(self._title_col)
+            self._ids.update(zip(titles, ids))
+            self._titles.update(zip(ids, titles))
+            self._rows.update(zip(ids, range(len(ids))))
+        else:
+            self._index(0, self._model.rowCount() - 1)
+        # fetched rows are indexed by _onRowsInserted
+        while self._model.canFetchMore():
+            self._model.fetchMore()
+
+    def _onRowsInserted(self, parent, first: int, last: int):
+        count = last - first + 1
+        if first < self._model.rowCount() - count:
+            # rows at and after `first` moved down
+            for row_id, row in self._rows.items():
+                if row >= first:
+                    self._rows[row_id] = row + count
+        self._index(first, last)
+
+    def _onLayoutChanged(self, *args):
+        if hasattr(self._model, "columnValues"):
+            ids = self._model.columnValues(0)
+            self._rows = dict(zip(ids, range(len(ids))))
+        else:
+            self.rebuild()
+
+    def _onDataChanged(self, top_left, bottom_right, *args):
+        if top_left.column() <= self._title_col <= bottom_right.column():
+            self._index(top_left.row(), bottom_right.row())
+
+    def id(self, title: str):
+        """id of title"""
+        return self._ids.get(title)
+
+    def title(self, row_id: int):
+        """title of id"""
+        return self._titles.get(row_id)
+
+    def row(self, row_id: int):
+        """model row of id"""
+        return self._rows.get(row_id)
@@ -20,9 +20,9 @@ class AppSettings(QDict):
     def load(self):
         """load settings from filename"""
 
-        # populate settings
+        # populate settings; defaults fill keys added since the file was saved
         setts = readJSON(self.filename, default=DEFAULT_SETTINGS)
-        self.update(setts)
+        self.update({**DEFAULT_SETTINGS, **setts})
 
     def save(self):
         """save to filename"""
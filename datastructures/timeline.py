@@ -0,0 +1,128 @@
+"""today's topics, cached until they are written or the day ends"""
+
+import logging
+from datetime import datetime, timedelta
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal
+from datastructures.datas import TopicData
+from datastructures.intervals import TopicIntervals
+from datastructures.coalescer import ChangeCoalescer
+from models import readTopics, today
+from constants import TIMEZONE
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_MS = 5000
+"""wait before reading the topics again after a failed read"""
+
+
+class TopicTimeline(QObject):
+    """
+    topics anchored to today, with their interval index;
+    read on the database worker when the topics model is written to and at midnight
+    """
+
+    changed = pyqtSignal()
+    """emitted after a rebuild"""
+    dayChanged = pyqtSignal()
+    """emitted after the first rebuild on a new day"""
+
+    def __init__(
+        self, topics_model, changes: ChangeCoalescer, worker, *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+
+        self._worker = worker
+        self._pending = 0
+        """rebuilds submitted and not yet applied"""
+        self._waiting: list = []
+        """called once the pending rebuilds are applied"""
+
+        self._midnight = QTimer(self)
+        self._midnight.setSingleShot(True)
+        self._midnight.setTimerType(Qt.TimerType.PreciseTimer)
+        self._midnight.timeout.connect(self._onMidnight)
+
+        # one rebuild for the several signals a single write emits
+        changes.watch(
+            (
+                topics_model.modelReset,
+                topics_model.dataChanged,
+                topics_model.rowsRemoved,
+            ),
+            self.rebuild,
+        )
+
+        # the first read is needed before the event loop runs
+        midnight = today()
+        self.day = midnight.date()
+        """day the topics are anchored to"""
+        self.topics: list[TopicData] = []
+        """ordered by start"""
+        self.intervals = TopicIntervals([])
+        self._apply(topics_model.getTopics(), midnight)
+
+    def _apply(self, topics: list[TopicData], midnight: datetime):
+        self.day = midnight.date()
+        self.topics = topics
+        self.intervals = TopicIntervals(topics)
+        self._armMidnight()
+
+    def _armMidnight(self):
+        now = datetime.now(tz=TIMEZONE)
+        tomorrow = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        tomorrow += timedelta(days=1)
+        self._midnight.start((tomorrow - now) // timedelta(milliseconds=1) + 1)
+
+    def rebuild(self):
+        """read the topics again, on the worker"""
+        self._pending += 1
+        self._read()
+
+    def _read(self):
+        midnight = today()
+        job = self._worker.submit(readTopics, midnight)
+        job.done.connect(lambda topics: self._onRead(topics, midnight))
+        job.failed.connect(self._onFailed)
+
+    def _onFailed(self, error: str):
+        # the topics read last stay anchored to their own day; still pending
+        logger.error(f"Reading topics failed, retrying: {error}")
+        QTimer.singleShot(RETRY_MS, self._read)
+
+    def _onRead(self, topics: list[TopicData], midnight: datetime):
+        # jobs finish in the order they were submitted; the last one wins
+        self._pending -= 1
+        new_day = midnight.date() != self.day
+        self._apply(topics, midnight)
+        self.changed.emit()
+        if new_day:
+            logger.info("New day: topics re-anchored")
+            self.dayChanged.emit()
+
+        if not self._pending:
+            waiting, self._waiting = self._waiting, []
+            for slot in waiting:
+                slot()
+
+    def afterRebuild(self, slot):
+        """call `slot` once the rebuilds in flight are applied, or now if none are"""
+        if self._pending:
+            self._waiting.append(slot)
+        else:
+            slot()
+
+    def _onMidnight(self):
+        if datetime.now(tz=TIMEZONE).date() == self.day:
+            # woke up early
+            self._armMidnight()
+            return
+        self.rebuild()
+
+    def covering(self, when: datetime):
+        """topics running at `when`, ordered by start"""
+        return self.intervals.covering(when)
+
+    def closest(self, when: datetime):
+        """running topic whose start is closest to `when`"""
+        return self.intervals.closest(when)
@@ -1,131 +1,288 @@
-"""populate the database with fake data for testing purposes"""
+"""populate a database with fake data for testing purposes"""
 
+import os
+import time
 import random
 import sqlite3
-from datetime import timedelta
+import logging
+import calendar
+import argparse
+from contextlib import contextmanager
+from multiprocessing import Pool
 from faker import Faker
-from constants import TIMEZONE, APP_DB
-
-
-fake = Faker()
-
-
-def generate_topic():
-    """create topic record data"""
-
-    # timestamp in the format "%Y-%m-%d %H:%M:%S"
-    timestamp = fake.date_time_this_decade(tzinfo=TIMEZONE).strftime(
-        "%Y-%m-%d %H:%M:%S"
+from migrations import migrateConnection
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 50_000
+"""rows generated per job and inserted per executemany"""
+TIMESTAMP_SPAN = (
+    calendar.timegm((2020, 1, 1, 0, 0, 0)),
+    calendar.timegm((2026, 1, 1, 0, 0, 0)),
+)
+"""fixed, and in UTC, so that a seed gives the same rows in every time zone"""
+DAY = 24 * 60 * 60
+
+_vocabulary: list[str] = []
+"""words to build text from; set in each worker process"""
+
+
+def _init(vocabulary: list[str]):
+    global _vocabulary
+    _vocabulary = vocabulary
+
+
+def vocabulary(seed: int):
+    """Faker's word list, in a seeded order"""
+    fake = Faker()
+    fake.seed_instance(seed)
+    words = sorted(set(fake.get_words_list()))
+    random.Random(seed).shuffle(words)
+    return words
+
+
+def sentences(rng: random.Random, count: int, nb_words: int):
+    """`count` sentences, drawing all their words at once"""
+    words = rng.choices(_vocabulary, k=count * nb_words)
+    return [
+        " ".join(words[i : i + nb_words]).capitalize() + "."
+        for i in range(0, len(words), nb_words)
+    ]
+
+
+def timestamps(rng: random.Random, count: int):
+    """in the format "%Y-%m-%d %H:%M:%S" """
+    return [
+        time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(seconds))
+        for seconds in rng.choices(range(*TIMESTAMP_SPAN), k=count)
+    ]
+
+
+def clock(seconds: int):
+    """seconds of day in the format "HH:MM:SS" """
+    return time.strftime("%H:%M:%S", time.gmtime(seconds % DAY))
+
+
+def generate_topics(job: tuple):
+    """(timestamp, topic, starts, ends, enabled) rows"""
+    seed, start, count, first = job
+    rng = random.Random(f"{seed}-topics-{start}")
+
+    rows = []
+    for i, created, title in zip(
+        range(start, start + count), timestamps(rng, count), sentences(rng, count, 3)
+    ):
+        starts = rng.randrange(DAY)
+        rows.append(
+            (
+                created,
+                # unique, after the rows of earlier loads
+                f"{title[:-1]} {first + i}",
+                clock(starts),
+                clock(starts + 20 * 60),
+                rng.randint(0, 1),
+            )
+        )
+    return rows
+
+
+def generate_notes(job: tuple):
+    """(timestamp, topic_id, note) rows"""
+    seed, start, count, topic_ids = job
+    rng = random.Random(f"{seed}-notes-{start}")
+
+    return list(
+        zip(
+            timestamps(rng, count),
+            rng.choices(topic_ids, k=count),
+            sentences(rng, count, 30),
+        )
     )
 
-    # topic
-    topic = fake.unique.sentence(nb_words=3)
 
-    # start and end in the format "HH:MM"
-    starts = fake.date_time_this_year()
-    ends = starts + timedelta(minutes=20)
-
-    # enabled
-    enabled = random.randint(0, 1)
-
-    return (
-        timestamp,
-        topic,
-        starts.strftime("%H:%M:%S"),
-        ends.strftime("%H:%M:%S"),
-        enabled,
+def generate_problems(job: tuple):
+    """(timestamp, problem, topic_id) rows"""
+    seed, start, count, first, topic_ids = job
+    rng = random.Random(f"{seed}-problems-{start}")
+
+    return list(
+        zip(
+            timestamps(rng, count),
+            # unique, after the rows of earlier loads
+            (
+                f"{title[:-1]} {first + i}"
+                for i, title in zip(
+                    range(start, start + count), sentences(rng, count, 3)
+                )
+            ),
+            rng.choices(topic_ids, k=count),
+        )
     )
 
 
-def generate_note():
-    """create topic record data"""
-
-    # timestamp in the format "%Y-%m-%d %H:%M:%S"
-    timestamp = fake.date_time_this_decade(tzinfo=TIMEZONE).strftime(
-        "%Y-%m-%d %H:%M:%S"
-    )
-
-    note = fake.sentence(nb_words=30)
-
-    return timestamp, note
-
-
-def generate_problem():
-    """create problem record data"""
-
-    # timestamp in the format "%Y-%m-%d %H:%M:%S"
-    timestamp = fake.date_time_this_decade(tzinfo=TIMEZONE).strftime(
-        "%Y-%m-%d %H:%M:%S"
-    )
-
-    problem = fake.unique.sentence(nb_words=3)
-
-    return timestamp, problem
-
-
-def insert_topic(conn: sqlite3.Connection, *args):
-    """insert topic to table"""
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        INSERT INTO topics (timestamp, topic, starts, ends, enabled) 
-        VALUES (?, ?, ?, ?, ?)
+def jobs(seed: int, total: int, *args):
+    """
+    split `total` rows into chunks; the chunks, not the workers, fix the rows;
+    `args`, like the largest id already in the table, are passed to every chunk
+    """
+    for start in range(0, total, CHUNK_SIZE):
+        yield (seed, start, min(CHUNK_SIZE, total - start), *args)
+
+
+def insert(conn: sqlite3.Connection, sql: str, chunks):
+    """insert generated chunks, all in one transaction"""
+    count = 0
+    with conn:
+        for rows in chunks:
+            conn.executemany(sql, rows)
+            count += len(rows)
+    return count
+
+
+@contextmanager
+def indexesDeferred(conn: sqlite3.Connection, tables: tuple[str, ...]):
+    """drop the indexes of `tables` and build them once the load is in"""
+    indexes = conn.execute(
+        f"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL
+        AND tbl_name IN ({', '.join('?' * len(tables))})
         """,
-        args,
-    )
-    conn.commit()
-
-    # return the primary key of the inserted record
-    return cursor.lastrowid
-
-
-def insert_note(conn: sqlite3.Connection, topic_id: int, *args):
-    """insert note to table"""
-    cursor = conn.cursor()
-    timestamp, note = args
-
-    cursor.execute(
+        tables,
+    ).fetchall()
+    with conn:
+        for name, _ in indexes:
+            conn.execute(f"DROP INDEX {name}")
+    try:
+        yield
+    finally:
+        with conn:
+            for _, sql in indexes:
+                conn.execute(sql)
+
+
+@contextmanager
+def triggersDeferred(conn: sqlite3.Connection):
+    """
+    drop the change log and full-text triggers, then create them again and
+    rebuild the full-text indexes once the load is in;
+    generated rows reach backups with the next full backup
+    """
+    triggers = conn.execute(
+        r"""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'trigger'
+        AND (name LIKE '%\_changelog\_%' ESCAPE '\' OR name LIKE '%\_fts\_%' ESCAPE '\')
         """
-        INSERT INTO notes (timestamp, topic_id, note) 
-        VALUES (?, ?, ?)
-        """,
-        (timestamp, topic_id, note),
+    ).fetchall()
+    fts_tables = {
+        f"{name.rsplit('_fts_', 1)[0]}_fts" for name, _ in triggers if "_fts_" in name
+    }
+    with conn:
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+    try:
+        yield
+    finally:
+        with conn:
+            for _, sql in triggers:
+                conn.execute(sql)
+            for fts in sorted(fts_tables):
+                conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def populate(
+    conn: sqlite3.Connection,
+    imap,
+    seed: int,
+    topics: int,
+    notes: int,
+    problems: int,
+):
+    """insert the requested number of fake rows, generated by `imap`"""
+    # a change log row and an index update per generated row would double the writes
+    with triggersDeferred(conn):
+        _populate(conn, imap, seed, topics, notes, problems)
+
+
+def _populate(
+    conn: sqlite3.Connection,
+    imap,
+    seed: int,
+    topics: int,
+    notes: int,
+    problems: int,
+):
+    first = conn.execute("SELECT COALESCE(MAX(id), 0) FROM topics").fetchone()[0]
+    insert(
+        conn,
+        "INSERT INTO topics (timestamp, topic, starts, ends, enabled) "
+        "VALUES (?, ?, ?, ?, ?)",
+        imap(generate_topics, jobs(seed, topics, first)),
     )
-    conn.commit()
-
-
-def insert_problem(conn: sqlite3.Connection, topic_id: int, *args):
-    """insert problem to table"""
-    cursor = conn.cursor()
-    timestamp, problem = args
-
-    cursor.execute(
-        """
-        INSERT INTO problems (timestamp, problem, topic_id) 
-        VALUES (?, ?, ?)
-        """,
-        (timestamp, problem, topic_id),
+    topic_ids = [
+        row[0]
+        for row in conn.execute(
+            "SELECT id FROM topics WHERE id > ? ORDER BY id", (first,)
+        )
+    ]
+    if not topic_ids:
+        return
+
+    first_problem = conn.execute(
+        "SELECT COALESCE(MAX(id), 0) FROM problems"
+    ).fetchone()[0]
+
+    # an ordered imap keeps the output independent of the number of workers
+    with indexesDeferred(conn, ("notes", "problems")):
+        insert(
+            conn,
+            "INSERT INTO notes (timestamp, topic_id, note) VALUES (?, ?, ?)",
+            imap(generate_notes, jobs(seed, notes, topic_ids)),
+        )
+        insert(
+            conn,
+            "INSERT INTO problems (timestamp, problem, topic_id) VALUES (?, ?, ?)",
+            imap(generate_problems, jobs(seed, problems, first_problem, topic_ids)),
+        )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--notes", type=int, default=5500)
+    parser.add_argument("--problems", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    # never the app's database: the load drops its triggers while it runs
+    parser.add_argument(
+        "--db", required=True, help="database file; a copy, not one the app has open"
     )
-    conn.commit()
-
-
-def main():
-    conn = sqlite3.connect(APP_DB)
-
-    for _ in range(1000):
-        row = generate_topic()
-        pk = insert_topic(conn, *row)
-
-        for _ in range(random.randint(1, 10)):
-            note = generate_note()
-            insert_note(conn, pk, *note)
-
-        for _ in range(random.randint(1, 3)):
-            note = generate_problem()
-            insert_problem(conn, pk, *note)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    # a lost load is regenerated from its seed
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    migrateConnection(conn)
+
+    counts = (args.seed, args.topics, args.notes, args.problems)
+    if args.workers > 1:
+        with Pool(args.workers, _init, (vocabulary(args.seed),)) as pool:
+            populate(conn, pool.imap, *counts)
+    else:
+        # not worth pickling the rows
+        _init(vocabulary(args.seed))
+        populate(conn, map, *counts)
 
     conn.close()
+    logger.info(
+        f"{args.topics} topics, {args.notes} notes and {args.problems} problems "
+        f"written to '{args.db}' in {time.perf_counter() - start:.1f} s"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+"""queries run on a thread of their own, off the GUI thread"""
+
+import logging
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal, pyqtSlot
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+from database import openDatabase
+
+
+logger = logging.getLogger(__name__)
+
+CONNECTION = "dbworker"
+"""name of the worker's connection"""
+
+
+class Job(QObject):
+    """
+    a call queued on the worker; `done` or `failed` is emitted on the thread
+    that submitted it, so slots connected right after submitting always run
+    """
+
+    # the call's return value
+    done = pyqtSignal(object)
+    # error message
+    failed = pyqtSignal(str)
+
+    # emitted on the worker thread; (return value, error message)
+    _finished = pyqtSignal(object, str)
+
+    def __init__(self, fn, args: tuple, write: bool, **kwargs):
+        super().__init__(**kwargs)
+
+        self.fn = fn
+        self.args = args
+        self.write = write
+        self._finished.connect(self._onFinished)
+
+    @pyqtSlot(object, str)
+    def _onFinished(self, result, error: str):
+        if error:
+            self.failed.emit(error)
+        else:
+            self.done.emit(result)
+
+
+class _Runner(QObject):
+    """lives on the worker thread, with the connection it opens there"""
+
+    def __init__(self, path: str, profile: dict):
+        super().__init__()
+
+        self.path = path
+        self.profile = profile
+        self.db: QSqlDatabase | None = None
+
+    @pyqtSlot()
+    def open(self):
+        self.db = openDatabase(self.path, self.profile, name=CONNECTION)
+        if not self.db.isOpen():
+            logger.error(f"Worker DB did not open: {self.db.lastError().text()}")
+
+    def _exec(self, sql: str):
+        query = QSqlQuery(db=self.db)
+        if not query.exec(sql):
+            raise RuntimeError(query.lastError().text())
+
+    @pyqtSlot(object)
+    def run(self, job: Job):
+        began = False
+        try:
+            if job.write:
+                # takes the write lock before the job's first read; a deferred
+                # BEGIN could not upgrade once a GUI write committed after that read
+                self._exec("BEGIN IMMEDIATE")
+                began = True
+            result = job.fn(self.db, *job.args)
+            if job.write:
+                self._exec("COMMIT")
+        except Exception as e:
+            if began:
+                QSqlQuery(db=self.db).exec("ROLLBACK")
+            logger.error(f"Worker job {job.fn.__name__} failed: {e}")
+            job._finished.emit(None, str(e) or type(e).__name__)
+        else:
+            job._finished.emit(result, "")
+
+    @pyqtSlot()
+    def close(self):
+        self.db.close()
+        self.db = None
+        QSqlDatabase.removeDatabase(CONNECTION)
+
+
+class DatabaseWorker(QObject):
+    """
+    one thread with its own connection to the database at `path`;
+    jobs run one at a time, in the order they were submitted
+    """
+
+    _submitted = pyqtSignal(object)
+    _closing = pyqtSignal()
+    _suspending = pyqtSignal()
+    _resuming = pyqtSignal()
+
+    def __init__(self, path: str, profile: dict, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.path = path
+        self._jobs: set[Job] = set()
+        """keeps jobs alive until they have reported"""
+        self._held: list[Job] | None = None
+        """jobs submitted while suspended; None if not suspended"""
+
+        self._thread = QThread()
+        self._thread.setObjectName(CONNECTION)
+        self._runner = _Runner(path, profile)
+        self._runner.moveToThread(self._thread)
+
+        self._thread.started.connect(self._runner.open)
+        self._submitted.connect(self._runner.run)
+        self._closing.connect(self._runner.close)
+        # returns once the jobs queued before it have run
+        self._suspending.connect(
+            self._runner.close, Qt.ConnectionType.BlockingQueuedConnection
+        )
+        self._resuming.connect(self._runner.open)
+        self._thread.start()
+
+    def submit(self, fn, *args, write: bool = False):
+        """
+        call fn(connection, *args) on the worker and return its Job;
+        a `write` runs in a transaction that is rolled back if fn raises
+        """
+        job = Job(fn, args, write)
+        self._jobs.add(job)
+        job.done.connect(lambda _: self._jobs.discard(job))
+        job.failed.connect(lambda _: self._jobs.discard(job))
+        if self._held is None:
+            self._submitted.emit(job)
+        else:
+            self._held.append(job)
+        return job
+
+    def suspend(self):
+        """
+        finish the submitted jobs and close the connection, so that the
+        database file can be replaced; later jobs wait for resume
+        """
+        if self._held is not None or not self._thread.isRunning():
+            return
+        self._suspending.emit()
+        self._held = []
+        logger.info("Database worker suspended")
+
+    def resume(self, profile: dict):
+        """open the connection again with `profile` and run the jobs held"""
+        if self._held is None:
+            return
+        # the thread is idle; nothing reads the profile meanwhile
+        self._runner.profile = profile
+        self._resuming.emit()
+        held, self._held = self._held, None
+        for job in held:
+            self._submitted.emit(job)
+        logger.info(f"Database worker resumed with {len(held)} held jobs")
+
+    def close(self):
+        """finish the submitted jobs, then close the connection and the thread"""
+        if not self._thread.isRunning():
+            return
+        if self._held is None:
+            self._closing.emit()
+        else:
+            # suspended; the connection is closed already
+            logger.warning(f"{len(self._held)} jobs held by the worker dropped")
+        self._thread.quit()
+        self._thread.wait()
+        logger.info("Database worker stopped")
@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (
     QMessageBox,
 )
 from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import pyqtSignal
 from models import NotesModel, TopicsModel, ProblemsModel
 from customwidgets.menus import NewTopicMenu, NewProblemMenu
 from screens.settings import SettingsWindow
@@ -21,6 +22,11 @@ logger = logging.getLogger(__name__)
 class MainWindow(QWidget):
     """main application window"""
 
+    restoreStarting = pyqtSignal()
+    """emitted before a backup replaces the database"""
+    restoreFinished = pyqtSignal()
+    """emitted once a restore finished, whether or not it replaced the database"""
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -41,6 +47,14 @@ class MainWindow(QWidget):
         self.settingsview.topic_options.new_topic.setMenu(self.topic_menu)
         self.settingsview.problem_options.new_problem.setMenu(self.problem_menu)
 
+        for table in (
+            self.notesview.table_group,
+            self.settingsview.topic_options,
+            self.settingsview.problem_options,
+        ):
+            table.restoreStarting.connect(self.restoreStarting)
+            table.restoreFinished.connect(self.restoreFinished)
+
         self.tabwidget = QTabWidget()
         self.tabwidget.setTabBarAutoHide(True)
         self.tabwidget.setMovable(True)
@@ -74,6 +88,21 @@ class MainWindow(QWidget):
         """set model for problems"""
         self.settingsview.setProblemsModel(model)
 
+    def setSearchIndex(self, index):
+        """search tables through the full-text index"""
+        self.notesview.table_group.setSearchIndex(index, "notes")
+        self.settingsview.topic_options.setSearchIndex(index, "topics")
+        self.settingsview.problem_options.setSearchIndex(index, "problems")
+
+    def setDatabaseWorker(self, worker):
+        """back the database of `worker` up from the tables' menus"""
+        for table in (
+            self.notesview.table_group,
+            self.settingsview.topic_options,
+            self.settingsview.problem_options,
+        ):
+            table.setDatabaseWorker(worker)
+
     def ask(self, quiz: str):
         return (
             QMessageBox.question(
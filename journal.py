@@ -0,0 +1,211 @@
+"""write-behind journal for activities logged from the input popup"""
+
+import os
+import logging
+import orjson
+from dataclasses import asdict
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+from models import DatabaseBusy, writeActivity
+from datastructures.datas import ActivityData
+
+
+logger = logging.getLogger(__name__)
+
+FLUSH_DELAY_MS = 500
+"""entries logged within this long are written in one transaction"""
+JOURNAL_SUFFIX = ".notes.jsonl"
+"""journal file is the database path plus this"""
+FAILED_SUFFIX = ".notes.failed.jsonl"
+"""entries that could not be written are moved to the database path plus this"""
+
+
+def appliedSeq(db: QSqlDatabase):
+    """seq of the last journal entry written to db"""
+    query = QSqlQuery(db=db)
+    if query.exec("SELECT seq FROM journal_state WHERE id = 1") and query.next():
+        return query.value(0)
+    return 0
+
+
+def readJournal(path: str):
+    """entries in the journal at `path`; a torn last line is dropped"""
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, "rb") as file:
+        for line in file:
+            try:
+                entries.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                logger.warning(f"Dropped a partly written entry in '{path}'")
+                break
+    return entries
+
+
+def syncLines(path: str, entries: list[dict]):
+    """append entries to the file at `path` and sync it"""
+    with open(path, "ab") as file:
+        for entry in entries:
+            file.write(orjson.dumps(entry) + b"\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def deadLetter(path: str, entries: list[dict]):
+    """keep entries that could not be written in the file at `path`, once each"""
+    kept = {e["seq"] for e in readJournal(path)}
+    syncLines(path, [e for e in entries if e["seq"] not in kept])
+
+
+def applyEntries(db: QSqlDatabase, entries: list[dict], failed_path: str):
+    """
+    write the entries not yet in db, in the worker's transaction, each as one
+    unit; an entry that fails is moved to the file at `failed_path`,
+    so it cannot hold back the rest and is not lost.
+    DatabaseBusy is raised so that the whole batch is tried again.
+    returns (last seq written, new note ids, new problem ids, solved problem ids)
+    """
+    query = QSqlQuery(db=db)
+    applied = appliedSeq(db)
+    written = ([], [], [])
+    failed = []
+
+    for entry in entries:
+        if entry["seq"] <= applied:
+            # written before a crash, journal not yet trimmed
+            continue
+
+        query.exec("SAVEPOINT entry")
+        try:
+            ids = writeActivity(db, ActivityData(**entry["activity"]))
+        except DatabaseBusy:
+            # nothing wrong with the entry; the transaction is rolled back
+            raise
+        except RuntimeError as e:
+            query.exec("ROLLBACK TO entry")
+            logger.error(f"Journal entry {entry['seq']} moved to '{failed_path}': {e}")
+            failed.append({**entry, "error": str(e)})
+        else:
+            for row_id, ids_written in zip(ids, written):
+                if row_id is not None:
+                    ids_written.append(row_id)
+        query.exec("RELEASE entry")
+
+        applied = entry["seq"]
+
+    if failed:
+        # kept before the seq moves past them; a retried batch is not kept twice
+        deadLetter(failed_path, failed)
+
+    query.prepare("UPDATE journal_state SET seq = ? WHERE id = 1")
+    query.addBindValue(applied)
+    if not query.exec():
+        raise RuntimeError(query.lastError().text())
+    return applied, *written
+
+
+class NoteJournal(QObject):
+    """
+    notes are appended to a journal file next to the database at `db_path`,
+    synced, and written to the database in batches on the database worker;
+    the journal is replayed on start
+    """
+
+    # new note ids, new problem ids, solved problem ids
+    flushed = pyqtSignal(list, list, list)
+
+    def __init__(self, db_path: str, applied: int, worker, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.path = db_path + JOURNAL_SUFFIX
+        self.failed_path = db_path + FAILED_SUFFIX
+        self._worker = worker
+        self._pending = [e for e in readJournal(self.path) if e["seq"] > applied]
+        """entries not yet written to the database"""
+        self._seq = max([applied, *(e["seq"] for e in self._pending)])
+        self._flushing = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(FLUSH_DELAY_MS)
+        self._timer.timeout.connect(self.flush)
+
+        self._trim()
+        if self._pending:
+            logger.info(f"Replaying {len(self._pending)} journaled notes")
+            self.flush()
+
+    def append(self, activity: ActivityData):
+        """journal an activity and sync it"""
+        self._seq += 1
+        entry = {"seq": self._seq, "activity": asdict(activity)}
+        syncLines(self.path, [entry])
+
+        self._pending.append(entry)
+        if not self._flushing and not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """write the pending entries now, unless a flush is already running"""
+        self._timer.stop()
+        if self._flushing or not self._pending:
+            return
+        self._flushing = True
+        job = self._worker.submit(
+            applyEntries, list(self._pending), self.failed_path, write=True
+        )
+        job.done.connect(self._onFlushed)
+        job.failed.connect(self._onFailed)
+
+    def _onFlushed(self, result: tuple):
+        applied, note_ids, problem_ids, solved_ids = result
+        self._flushing = False
+        self._pending = [e for e in self._pending if e["seq"] > applied]
+        self._trim()
+        logger.info(f"Flushed {len(note_ids)} journaled notes")
+        self.flushed.emit(note_ids, problem_ids, solved_ids)
+
+        if self._pending:
+            self._timer.start()
+
+    def _onFailed(self, error: str):
+        # kept in the journal and tried again shortly
+        self._flushing = False
+        logger.error(f"Journal flush failed, retrying: {error}")
+        self._timer.start()
+
+    def rebase(self, applied: int):
+        """
+        number the pending entries after `applied`, the seq of a database that
+        replaced the one they were journaled for; renumbered in place, so a
+        flush held by the suspended worker writes them under their new seqs
+        """
+        for seq, entry in enumerate(self._pending, applied + 1):
+            entry["seq"] = seq
+        self._seq = applied + len(self._pending)
+        self._trim()
+
+    def _trim(self):
+        """rewrite the journal with the pending entries only"""
+        if not self._pending:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+
+        part = f"{self.path}.part"
+        with open(part, "wb") as file:
+            for entry in self._pending:
+                file.write(orjson.dumps(entry) + b"\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(part, self.path)
+
+    def close(self):
+        """queue the last flush; the worker writes it before it stops"""
+        self._timer.stop()
+        if self._pending:
+            # entries already in flight are skipped by their seq
+            self._worker.submit(
+                applyEntries, list(self._pending), self.failed_path, write=True
+            )
@@ -4,20 +4,26 @@ import sys
 import logging
 from datetime import datetime
 from PyQt6.QtWidgets import QApplication, QSystemTrayIcon
-from PyQt6.QtCore import QTimer
-from PyQt6.QtSql import QSqlDatabase
 from PyQt6.QtGui import QIcon
 from humanize import naturaltime
 from gui import MainWindow
-from models import NotesModel, TopicsModel, ProblemsModel
+from models import NotesModel, TopicsModel, ProblemsModel, readProblems, writeActivity
+from database import openDatabase, applyProfile
+from dbworker import DatabaseWorker
+from journal import NoteJournal, appliedSeq
+from migrations import migrate
+from search import SearchIndex
+from scheduler import NotificationScheduler
+from backup import BackupScheduler
 from customwidgets.menus import TrayMenu
 from customwidgets.delegates import NotesDelegate, ProblemsDelegate
 from screens.note_input import InputPopup
 from datastructures.settings import settings
-from datastructures.datas import TopicData
-from utils import close_topic
+from datastructures.datas import ActivityData, TopicData
+from datastructures.timeline import TopicTimeline
+from datastructures.coalescer import ChangeCoalescer
 from qstyles import STYLE
-from constants import APP_DB, APP_ICON, TIMEZONE, SOLVED_PLACEHOLDER
+from constants import APP_DB, APP_ICON, BACKUP_DIR, TIMEZONE, SOLVED_PLACEHOLDER
 
 
 logging.basicConfig(
@@ -33,23 +39,20 @@ class Tracker:
     application-level logic
     """
 
-    def __init__(self):
+    def __init__(self, db_path: str = APP_DB, backup_dir: str = BACKUP_DIR):
 
-        self._today = datetime.now(tz=TIMEZONE).weekday()
-        """day of the week where Mon=0 and Sun=6"""
         self.show_notifications = True
 
         self.app_icon = QIcon(APP_ICON)
 
-        self.db = QSqlDatabase.addDatabase("QSQLITE")
-        self.db.setDatabaseName(APP_DB)
-        self.db.open()
+        self.db = openDatabase(db_path, settings["db_profile"])
 
         self.disable_sat = settings["disable_saturday"]
         self.disable_sun = settings["disable_sunday"]
 
         if self.db.isOpen():
             logger.info("SQLite file opened successfully")
+            migrate(self.db)
         else:
             logger.error(f"SQLite did not open: {self.db.lastError().driverText()}")
 
@@ -57,45 +60,85 @@ class Tracker:
 
         self.gui = MainWindow()
 
+        # reads for the tray menu, popup, problem menu and problems table
+        # stay off the GUI thread
+        self.db_worker = DatabaseWorker(db_path, settings["db_profile"], self.gui)
+
+        # notes from the popup are journaled and written in batches
+        self.journal = NoteJournal(
+            db_path, appliedSeq(self.db), self.db_worker, self.gui
+        )
+        # the journal's last flush is queued before the worker stops
+        QApplication.instance().aboutToQuit.connect(self.journal.close)
+        QApplication.instance().aboutToQuit.connect(self.db_worker.close)
+
         self.input_window = InputPopup()
         self.input_window.setWindowIcon(self.app_icon)
         # link buttons
         self.input_window.submit.clicked.connect(self.logNote)
         self.input_window.prompt.linkActivated.connect(self.showAddTopic)
 
-        self.notification_timer = QTimer(self.gui)
-        self.notification_timer.timeout.connect(self.onTimeout)
+        self.current_topic: TopicData | None = None
+
+        self.scheduler = NotificationScheduler(self.gui)
+        self.scheduler.boundaryReached.connect(self.onTimeout)
+        self.scheduler.reminderDue.connect(self.onReminder)
         self._setNotificationsInterval()
-        self.notification_timer.start()
+
+        self.backup_scheduler = BackupScheduler(self.db_worker, backup_dir, self.gui)
+        self.backup_scheduler.setCompression(settings["backup_compression"])
+        self._setBackupSchedule()
 
         # models
         self.topics_model = TopicsModel(self.db)
         self.problems_model = ProblemsModel(self.db)
+        # read once here, before the event loop runs; reselects read on the worker
+        self.problems_model.setWorker(self.db_worker)
         self.notes_model = NotesModel(self.db)
 
-        self.all_topics = self.topics_model.getTopics()
+        self.search_index = SearchIndex(self.db)
+
+        # model signals, batched into one refresh per consumer per event loop turn
+        self.changes = ChangeCoalescer(self.gui)
+
+        # today's topics, shared by the tray menu, input popup and problem menu
+        self.timeline = TopicTimeline(
+            self.topics_model, self.changes, self.db_worker, self.gui
+        )
+        self.scheduler.setTopics(self.timeline.topics)
 
         self.gui.setNotesModel(self.notes_model)
         self.gui.setTopicsModel(self.topics_model)
         self.gui.setProblemsModel(self.problems_model)
+        self.gui.setSearchIndex(self.search_index)
+        self.gui.setDatabaseWorker(self.db_worker)
 
         self.notes_delegate = NotesDelegate()
+        self.notes_delegate.setRegistry(self.topics_model.registry)
         self.problems_delegate = ProblemsDelegate()
+        self.problems_delegate.setRegistry(self.topics_model.registry)
 
         self.gui.notesview.table_group.setItemDelegate(self.notes_delegate)
         self.gui.settingsview.problem_options.table_view.setItemDelegate(
             self.problems_delegate
         )
 
-        self.topics_model.modelReset.connect(self.on_topics_changed)
-        self.topics_model.dataChanged.connect(self.on_topics_changed)
-        # self.topics_model.layoutChanged.connect(self.on_topics_changed)
-        self.topics_model.rowsRemoved.connect(self.on_topics_changed)
+        self.timeline.changed.connect(self.on_topics_changed)
+        self.journal.flushed.connect(self.onActivityWritten)
+        self.timeline.dayChanged.connect(self._checkWeekend)
+
+        self.changes.watch(
+            (
+                self.topics_model.modelReset,
+                self.topics_model.dataChanged,
+                self.topics_model.rowsRemoved,
+            ),
+            self.on_problems_changed,
+        )
 
-        self.topics_model.modelReset.connect(self.on_problems_changed)
-        self.topics_model.dataChanged.connect(self.on_problems_changed)
-        # self.topics_model.layoutChanged.connect(self.on_problems_changed)
-        self.topics_model.rowsRemoved.connect(self.on_problems_changed)
+        # a restore replaces the database file under closed connections
+        self.gui.restoreStarting.connect(self.closeDatabase)
+        self.gui.restoreFinished.connect(self.reopenDatabase)
 
         # notes viewer btns
         self.gui.notesview.table_group.new_note.clicked.connect(self.showInputWin)
@@ -128,33 +171,36 @@ class Tracker:
 
     def _topicIDByTitle(self, title: str):
         """return topic id"""
-        for topic in self.all_topics:
-            if topic.title == title:
-                return topic.topic_id
+        return self.topics_model.registry.id(title)
 
     def _problemID(self, problem: str):
         """get problem id by it's statement"""
-        for p in self.problems_model.getProblems():
-            if p.problem == problem:
-                return p.problem_id
+        return self.problems_model.registry.id(problem)
 
     def _setNotificationsInterval(self):
         """update notification interval"""
         after = self.gui.settingsview.notifs_options.duration_setter.minutes()
         logger.info(f"Interval set to: {after} minutes")
-        # convert to millisecs
-        self.notification_timer.setInterval(after * 60000)
+        self.scheduler.setInterval(after)
+
+    def _setBackupSchedule(self):
+        """set automatic backups from settings"""
+        self.backup_scheduler.setRotation(
+            settings["backup_keep_daily"], settings["backup_keep_weekly"]
+        )
+        self.backup_scheduler.setInterval(settings["backup_interval_hours"])
 
     def _checkWeekend(self):
         """if weekend; enable/disable notifications"""
-        if self._today == 5:
+        weekday = self.timeline.day.weekday()
+        if weekday == 5:
             logger.info("It is Saturday")
             if self.disable_sat:
                 self.toggleNotifications(True)
             else:
                 self.toggleNotifications(False)
 
-        elif self._today == 6:
+        elif weekday == 6:
             logger.info("It is Sunday")
             if self.disable_sun:
                 self.toggleNotifications(True)
@@ -165,8 +211,8 @@ class Tracker:
 
     def onStartup(self):
         """get things running right away"""
-        self.notes_delegate.setTopics(self.all_topics)
-        self.problems_delegate.setTopics(self.all_topics)
+        self.notes_delegate.setTopics(self.timeline.topics)
+        self.problems_delegate.setTopics(self.timeline.topics)
         self._checkWeekend()
         self.onTimeout()
 
@@ -184,20 +230,55 @@ class Tracker:
             case "disable_sunday":
                 self.disable_sun = settings["disable_sunday"]
                 self._checkWeekend()
+            case "db_profile":
+                applyProfile(self.db, settings["db_profile"])
+                # the worker's connection is only reachable from its thread
+                self.db_worker.submit(applyProfile, settings["db_profile"])
+            case "backup_interval_hours" | "backup_keep_daily" | "backup_keep_weekly":
+                self._setBackupSchedule()
+            case "backup_compression":
+                self.backup_scheduler.setCompression(settings["backup_compression"])
             case _:
                 pass
 
+    def closeDatabase(self):
+        """close every connection to the database, so a restore can replace it"""
+        self.backup_scheduler.setPaused(True)
+        # the last notes are written before the worker closes its connection
+        self.journal.flush()
+        self.db_worker.suspend()
+        self.db.close()
+        logger.info("Database closed for a restore")
+
+    def reopenDatabase(self):
+        """open the restored database, or the one a failed restore left"""
+        if self.db.open():
+            applyProfile(self.db, settings["db_profile"])
+            # a backup may predate the latest migrations
+            migrate(self.db)
+        else:
+            logger.error(f"SQLite did not open: {self.db.lastError().driverText()}")
+
+        # before the worker runs a flush it held
+        self.journal.rebase(appliedSeq(self.db))
+        self.db_worker.resume(settings["db_profile"])
+        self.backup_scheduler.setPaused(False)
+
+        # reselecting topics reselects notes and problems
+        self.topics_model.select()
+
     def getCurrentTopics(self):
         """calculate the currrent topics based on the current time"""
-        now = datetime.now(tz=TIMEZONE)
-        return [
-            topic for topic in self.all_topics if (topic.starts <= now <= topic.ends)
-        ]
+        return self.timeline.covering(datetime.now(tz=TIMEZONE))
 
-    def getUnsolvedProblems(self):
-        """get problems that not been solved"""
-        all_problems = self.problems_model.getProblems()
-        return [problem for problem in all_problems if not problem.solved]
+    def getCurrentTopic(self):
+        """the current topic that started closest to now"""
+        return self.timeline.closest(datetime.now(tz=TIMEZONE))
+
+    def refreshProblems(self):
+        """read the unsolved problems on the worker and list them in the popup"""
+        job = self.db_worker.submit(readProblems, True)
+        job.done.connect(self.input_window.setProblems)
 
     def setCurrentTopics(
         self,
@@ -249,46 +330,56 @@ class Tracker:
         topic_id = self._topicIDByTitle(topic_title)
         self.gui.problem_menu.on_done()
 
-        self.handle_problem(time_now, topic_id, new_problem, "")
-
-    def handle_problem(
-        self,
-        timestamp: str,
-        topic_id: int,
-        new_problem: str,
-        solved: str,
-    ):
-        """create new problem if does not exists, mark old as solved if exists"""
-
-        changed = False
-
         if new_problem:
-            changed = self.problems_model.newProblem(timestamp, topic_id, new_problem)
-
-        if solved and (solved != SOLVED_PLACEHOLDER):
-            solved_id = self._problemID(solved)
-            changed = self.problems_model.markSolved(solved_id)
-
-        if changed:  # if problems table changed
+            self.logActivity(
+                ActivityData(timestamp=time_now, topic_id=topic_id, problem=new_problem)
+            )
 
-            problems = self.getUnsolvedProblems()
-            self.input_window.setProblems(problems)
+    def logActivity(self, activity: ActivityData):
+        """write an activity in one transaction on the worker, refresh once"""
+        job = self.db_worker.submit(writeActivity, activity, write=True)
+        job.done.connect(
+            lambda ids: self.onActivityWritten(
+                *([row_id] if row_id is not None else [] for row_id in ids)
+            )
+        )
 
     def logNote(self):
-        """add note record to database"""
+        """journal the note and hide the popup; the journal writes it shortly"""
         time_now = datetime.now(tz=TIMEZONE).strftime("%Y-%m-%d %H:%M:%S")
         topic_title = self.input_window.topics.child.currentText()
         topic_id = self._topicIDByTitle(topic_title)
-        notes = self.input_window.notes.child.toPlainText()
+        if topic_id is None:
+            logger.error(f"No topic titled '{topic_title}' to log the note under")
+            return
 
-        new_problem = self.input_window.problem.child.text()
         solved_problem = self.input_window.solved_problem.child.currentText()
-
-        self.handle_problem(time_now, topic_id, new_problem, solved_problem)
-
-        if self.notes_model.newNote(time_now, topic_id, notes):
-            self.input_window.clear()
-            self.input_window.hide()
+        solved_id = None
+        if solved_problem and (solved_problem != SOLVED_PLACEHOLDER):
+            solved_id = self._problemID(solved_problem)
+
+        # the note and the problem it raised or solved are written together
+        self.journal.append(
+            ActivityData(
+                timestamp=time_now,
+                topic_id=topic_id,
+                note=self.input_window.notes.child.toPlainText(),
+                problem=self.input_window.problem.child.text() or None,
+                solved_id=solved_id,
+            )
+        )
+        self.input_window.clear()
+        self.input_window.hide()
+
+    def onActivityWritten(self, note_ids: list, problem_ids: list, solved_ids: list):
+        """show notes, and the problems they raised or solved, once written"""
+        if note_ids:
+            self.notes_model.showInserted(note_ids)
+        if problem_ids or solved_ids:
+            # only the rows written are read back
+            self.problems_model.showInserted(problem_ids)
+            self.problems_model.showUpdated(solved_ids)
+            self.refreshProblems()
 
     def deleteNote(self):
         """delete note record from database"""
@@ -298,13 +389,7 @@ class Tracker:
             if self.gui.ask(
                 f"{logs_len} {'logs' if logs_len > 1 else 'log'} will be deleted permanently.\nAre you sure you want to delete?"
             ):
-                for index in selected:
-                    row = index.row()
-                    self.notes_model.deleteRowFromTable(row)
-                    logger.info(f"Activity at {row} deleted from 'notes' table")
-
-                    # apply changes
-                self.notes_model.select()
+                self.notes_model.deleteRows(index.row() for index in selected)
                 self.gui.notesview.table_group.del_btn.hide()
 
     def saveTopic(self):
@@ -317,8 +402,9 @@ class Tracker:
 
         if self.topics_model.newTopic(time_now, topic, starts, ends, show_notifs):
             self.gui.topic_menu.on_done()
-            # show changes right away
-            self.onTimeout()
+            # show changes once the timeline has them
+            self.changes.flush()
+            self.timeline.afterRebuild(self.onTimeout)
 
     def deleteTopic(self):
         """delete topic details in settings"""
@@ -329,16 +415,11 @@ class Tracker:
             f"All logs related to {rows_len} {'topics' if rows_len > 1 else 'topic'} will be deleted.\nAre you sure you want to delete?"
         ):
 
-            for index in rows:
-                row = index.row()
-                self.topics_model.deleteRowFromTable(row)
-                logger.info(f"Topic at {row} deleted from 'topics' table")
-
-            # apply changes
-            self.topics_model.select()
+            self.topics_model.deleteRows(index.row() for index in rows)
             self.gui.settingsview.topic_options.disableDnCheck()
-            # run check right away
-            self.onTimeout()
+            # run check once the timeline has the changes
+            self.changes.flush()
+            self.timeline.afterRebuild(self.onTimeout)
 
     def onTimeout(self):
         """
@@ -347,9 +428,12 @@ class Tracker:
         show message
         """
         topics = self.getCurrentTopics()
-        current_topic = close_topic(topics)
+        current_topic = self.getCurrentTopic()
+        self.current_topic = current_topic
+        # remind while a topic is running
+        self.scheduler.setReminding(current_topic is not None)
 
-        self.gui.problem_menu.setTopics(self.all_topics, current=current_topic)
+        self.gui.problem_menu.setTopics(self.timeline.topics, current=current_topic)
 
         if current_topic:
             # if topic is disabled or notifications are disabled for the current day
@@ -360,14 +444,17 @@ class Tracker:
         else:
             self.tray_menu.disableactn.setChecked(False)
 
-        problems = self.getUnsolvedProblems()
-        self.input_window.setProblems(problems)
+        self.refreshProblems()
 
         self.setCurrentTRange(current_topic)
         self.setCurrentTopics(topics, current_topic)
 
         self.showMessage(current_topic)
 
+    def onReminder(self):
+        """remind to log the running topic"""
+        self.showMessage(self.current_topic)
+
     def showMessage(self, current_topic: TopicData):
         """show log reminder"""
         if self.input_window.isHidden() and current_topic and self.show_notifications:
@@ -398,10 +485,12 @@ class Tracker:
 
     def on_topics_changed(self, *args, **kwargs):
         logger.info(f"Data changed in 'topics' model")
-        self.all_topics = self.topics_model.getTopics()
+        self.scheduler.setTopics(self.timeline.topics)
 
         topics = self.getCurrentTopics()
-        current_topic = close_topic(topics)
+        current_topic = self.getCurrentTopic()
+        self.current_topic = current_topic
+        self.scheduler.setReminding(current_topic is not None)
 
         self.setCurrentTRange(current_topic)
         self.setCurrentTopics(topics, current_topic)
@@ -410,15 +499,14 @@ class Tracker:
         self.notes_model.select()
         self.problems_model.select()
 
-        self.notes_delegate.setTopics(self.all_topics)
-        self.problems_delegate.setTopics(self.all_topics)
-        self.gui.problem_menu.setTopics(self.all_topics, current=current_topic)
+        self.notes_delegate.setTopics(self.timeline.topics)
+        self.problems_delegate.setTopics(self.timeline.topics)
+        self.gui.problem_menu.setTopics(self.timeline.topics, current=current_topic)
 
     def on_problems_changed(self, *args, **kwargs):
         logger.info(f"Data changed in 'problems' model")
 
-        problems = self.getUnsolvedProblems()
-        self.input_window.setProblems(problems)
+        self.refreshProblems()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+"""versioned database schema, tracked with PRAGMA user_version"""
+
+import logging
+import sqlite3
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS: list[tuple[str, ...]] = [
+    # 1: tables
+    (
+        # starts is time in the format HH:MM:SS
+        # ends is time in the format HH:MM:SS
+        # enabled is number; enabled=1, disabled=0
+        """
+        CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME,
+            topic TEXT NOT NULL UNIQUE,
+            starts TEXT NOT NULL,
+            ends TEXT NOT NULL,
+            enabled INTEGER NOT NULL DEFAULT 1
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME,
+            topic_id INTEGER NOT NULL,
+            note TEXT NOT NULL,
+            FOREIGN KEY(topic_id) REFERENCES topics(id) ON DELETE CASCADE
+        )
+        """,
+        # solved is number; 0=unsolved, 1=solved
+        """
+        CREATE TABLE IF NOT EXISTS problems (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME,
+            problem TEXT NOT NULL UNIQUE,
+            topic_id INTEGER NOT NULL,
+            solved INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY(topic_id) REFERENCES topics(id) ON DELETE CASCADE
+        )
+        """,
+    ),
+    # 2: indexes for sorting notes, joining and cascading on topics,
+    # and filtering problems
+    (
+        "CREATE INDEX IF NOT EXISTS notes_timestamp ON notes (timestamp)",
+        "CREATE INDEX IF NOT EXISTS notes_topic_id ON notes (topic_id)",
+        "CREATE INDEX IF NOT EXISTS problems_topic_solved ON problems (topic_id, solved)",
+    ),
+    # 3: change log for incremental backups
+    (
+        # ids of rows inserted, updated or deleted since they were last backed up
+        """
+        CREATE TABLE IF NOT EXISTS changelog (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            row_id INTEGER NOT NULL
+        )
+        """,
+        # seq is the last change in the backup
+        """
+        CREATE TABLE IF NOT EXISTS backup_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME,
+            kind TEXT NOT NULL,
+            path TEXT NOT NULL,
+            seq INTEGER NOT NULL
+        )
+        """,
+        *(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_changelog_{event.lower()}
+            AFTER {event} ON {table} BEGIN
+                INSERT INTO changelog (tbl, row_id) VALUES ('{table}', {row}.id);
+            END
+            """
+            for table in ("topics", "notes", "problems")
+            for event, row in (
+                ("INSERT", "new"),
+                ("UPDATE", "new"),
+                ("DELETE", "old"),
+            )
+        ),
+    ),
+    # 4: last note journal entry written to the database
+    (
+        """
+        CREATE TABLE IF NOT EXISTS journal_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL
+        )
+        """,
+        "INSERT OR IGNORE INTO journal_state (id, seq) VALUES (1, 0)",
+    ),
+    # 5: full-text indexes over the searchable text columns, kept in sync by triggers;
+    # IF NOT EXISTS for databases that got them before they were a migration
+    tuple(
+        sql
+        for table, column in (
+            ("notes", "note"),
+            ("topics", "topic"),
+            ("problems", "problem"),
+        )
+        for sql in (
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts
+            USING fts5({column}, content='{table}', content_rowid='id')
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {table}_fts (rowid, {column}) VALUES (new.id, new.{column});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {table}_fts ({table}_fts, rowid, {column})
+                VALUES ('delete', old.id, old.{column});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_au
+            AFTER UPDATE OF {column} ON {table} BEGIN
+                INSERT INTO {table}_fts ({table}_fts, rowid, {column})
+                VALUES ('delete', old.id, old.{column});
+                INSERT INTO {table}_fts (rowid, {column}) VALUES (new.id, new.{column});
+            END
+            """,
+            # index the rows written before the index existed
+            f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')",
+        )
+    ),
+]
+"""statements of each schema version; append new versions, never edit old ones"""
+
+
+def schemaVersion(db: QSqlDatabase):
+    """current schema version of db"""
+    query = QSqlQuery(db=db)
+    if query.exec("PRAGMA user_version") and query.next():
+        return query.value(0)
+    return 0
+
+
+def migrate(db: QSqlDatabase):
+    """bring db up to the latest schema version, one transaction per version"""
+    query = QSqlQuery(db=db)
+    current = schemaVersion(db)
+
+    for version, statements in enumerate(MIGRATIONS[current:], start=current + 1):
+        db.transaction()
+        for sql in statements:
+            if not query.exec(sql):
+                logger.error(
+                    f"Migration to version {version} failed: {query.lastError().text()}"
+                )
+                db.rollback()
+                return False
+
+        query.exec(f"PRAGMA user_version = {version}")
+        db.commit()
+        logger.info(f"Database migrated to version {version}")
+
+    return True
+
+
+def migrateConnection(conn: sqlite3.Connection):
+    """migrate for scripts that use sqlite3 instead of QtSql"""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    for version, statements in enumerate(MIGRATIONS[current:], start=current + 1):
+        # DDL does not start a transaction implicitly
+        conn.execute("BEGIN")
+        try:
+            for sql in statements:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {version}")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        conn.commit()
+        logger.info(f"Database migrated to version {version}")
@@ -1,16 +1,17 @@
 """PyQt6 models"""
 
+import sys
 import time
 import logging
-from datetime import datetime
-from PyQt6.QtCore import Qt, QSortFilterProxyModel
-from PyQt6.QtSql import (
-    QSqlQuery,
-    QSqlRelation,
-    QSqlTableModel,
-    QSqlRelationalTableModel,
-)
-from datastructures.datas import ProblemData, TopicData
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from operator import itemgetter
+from datetime import datetime, timedelta
+from PyQt6.QtCore import Qt, QModelIndex, QAbstractTableModel, QSortFilterProxyModel
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery, QSqlTableModel
+from datastructures.datas import ActivityData, ProblemData, TopicData
+from datastructures.registry import Registry
 from constants import TIMEZONE
 
 
@@ -36,38 +37,314 @@ PROBLEMS_HEADERS = {
 }
 
 
-class TopicsModel(QSqlTableModel):
-    """table model class that reads and writes topics to a local file database"""
+EPOCH = datetime(1970, 1, 1)
+"""naive; timestamps are stored as local time"""
 
-    def __init__(self, db, **kwargs):
+CHUNK_SIZE = 500
+"""ids bound per statement; below SQLite's bound-parameter limit"""
 
-        # create table if non-existent
-        self._query = QSqlQuery(db=db)
-        # starts is time in the format HH:MM
-        # ends is time in the format HH:MM
-        # enabled is number; enabled=1, disabled=0
-        created = self._query.exec(
-            """
-            CREATE TABLE IF NOT EXISTS topics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
-                topic TEXT NOT NULL UNIQUE,
-                starts TEXT NOT NULL,
-                ends TEXT NOT NULL,
-                enabled INTEGER NOT NULL DEFAULT 1
+
+BUSY_CODES = (5, 6)
+"""SQLITE_BUSY and SQLITE_LOCKED; a write that failed with these may be tried again"""
+
+
+class DatabaseBusy(RuntimeError):
+    """another connection held the database; nothing is wrong with the write"""
+
+
+def queryError(query: QSqlQuery):
+    """the error of a failed query, as DatabaseBusy if it can be tried again"""
+    error = query.lastError()
+    code = error.nativeErrorCode()
+    # extended result codes, like SQLITE_BUSY_SNAPSHOT, keep the primary code low
+    if code.isdigit() and int(code) & 0xFF in BUSY_CODES:
+        return DatabaseBusy(error.text())
+    return RuntimeError(error.text())
+
+
+def chunked(items: list, size: int = CHUNK_SIZE):
+    """yield consecutive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def today():
+    """local midnight that starts today"""
+    return datetime.now(tz=TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+TOPICS_LOAD = """
+    SELECT
+        id,
+        CAST(strftime('%s', timestamp) AS INTEGER),
+        topic,
+        -- a bare time is on 2000-01-01, a whole number of days since the epoch
+        strftime('%s', starts) % 86400,
+        strftime('%s', ends) % 86400,
+        enabled
+    FROM topics
+    ORDER BY 4, id
+    """
+"""topics with times as seconds, ordered by start"""
+
+
+def readTopics(db: QSqlDatabase, midnight: datetime):
+    """
+    topics ordered by start, starting on the day from `midnight`;
+    a topic that wraps past midnight ends on the next day.
+    takes the connection so that it can run on the database worker
+    """
+    query = QSqlQuery(db=db)
+    if not query.exec(TOPICS_LOAD):
+        logger.error(f"DB error reading topics: {query.lastError().text()}")
+        return []
+
+    topics_list: list[TopicData] = []
+    while query.next():
+        starts = midnight + timedelta(seconds=query.value(3))
+        ends = midnight + timedelta(seconds=query.value(4))
+        if ends <= starts:
+            ends += timedelta(days=1)
+        topics_list.append(
+            TopicData(
+                topic_id=query.value(0),
+                created=EPOCH + timedelta(seconds=query.value(1)),
+                title=query.value(2),
+                starts=starts,
+                ends=ends,
+                enabled=bool(query.value(5)),
+            )
+        )
+    return topics_list
+
+
+PROBLEMS_LOAD = """
+    SELECT id, CAST(strftime('%s', timestamp) AS INTEGER), problem, topic_id, solved
+    FROM problems {where}
+    ORDER BY timestamp, id
+    """
+"""problems with times as seconds, oldest first"""
+
+
+def readProblems(db: QSqlDatabase, unsolved_only: bool = False):
+    """problems, oldest first"""
+    where = "WHERE solved = 0" if unsolved_only else ""
+    query = QSqlQuery(db=db)
+    if not query.exec(PROBLEMS_LOAD.format(where=where)):
+        logger.error(f"DB error reading problems: {query.lastError().text()}")
+        return []
+
+    problems_list: list[ProblemData] = []
+    while query.next():
+        problems_list.append(
+            ProblemData(
+                problem_id=query.value(0),
+                created=EPOCH + timedelta(seconds=query.value(1)),
+                problem=query.value(2),
+                topic_id=query.value(3),
+                solved=bool(query.value(4)),
             )
+        )
+    return problems_list
+
+
+def readProblemColumns(db: QSqlDatabase):
+    """
+    topic id -> title, and every problem as lists in ProblemsModel.FIELDS order,
+    oldest first; takes the connection so that it can run on the database worker
+    """
+    query = QSqlQuery(db=db)
+    # rows are copied into the lists; the query need not cache them too
+    query.setForwardOnly(True)
+
+    titles = {}
+    if query.exec("SELECT id, topic FROM topics"):
+        while query.next():
+            titles[query.value(0)] = sys.intern(query.value(1))
+
+    columns = ([], [], [], [], [])
+    if query.exec(PROBLEMS_LOAD.format(where="")):
+        value, appends = query.value, [c.append for c in columns]
+        while query.next():
+            for column, append in enumerate(appends):
+                append(value(column))
+    else:
+        logger.error(f"DB error reading problems: {query.lastError().text()}")
+    # end the read transaction
+    query.finish()
+    return titles, columns
+
+
+def writeActivity(db: QSqlDatabase, activity: ActivityData):
+    """
+    the new problem, the solved problem and the note of one activity;
+    the caller holds the transaction, so raising RuntimeError undoes them all;
+    DatabaseBusy if another connection held the database.
+    returns the ids written, or None: (note id, new problem id, solved problem id)
+    """
+    query = QSqlQuery(db=db)
+
+    def run(sql: str, *values):
+        query.prepare(sql)
+        for value in values:
+            query.addBindValue(value)
+        if not query.exec():
+            raise queryError(query)
+
+    problem_id = None
+    if activity.problem:
+        # an existing problem is not raised again
+        run(
             """
+            INSERT INTO problems (timestamp, problem, topic_id) VALUES (?, ?, ?)
+            ON CONFLICT(problem) DO NOTHING
+            """,
+            activity.timestamp,
+            activity.problem,
+            activity.topic_id,
+        )
+        if query.numRowsAffected() > 0:
+            problem_id = query.lastInsertId()
+
+    if activity.solved_id is not None:
+        run("UPDATE problems SET solved = 1 WHERE id = ?", activity.solved_id)
+
+    note_id = None
+    if activity.note is not None:
+        run(
+            "INSERT INTO notes (timestamp, topic_id, note) VALUES (?, ?, ?)",
+            activity.timestamp,
+            activity.topic_id,
+            activity.note,
+        )
+        note_id = query.lastInsertId()
+
+    return note_id, problem_id, activity.solved_id
+
+
+class BulkEditMixin:
+    """batched, transactional writes by primary key for the table models"""
+
+    registry: Registry | None = None
+    """id/title/row indexes, if the model keeps them"""
+
+    def rowIds(self, rows):
+        """primary keys of the given rows; column 0 is the id"""
+        return [self.index(row, 0).data() for row in rows]
+
+    def idRows(self, ids: list):
+        """sorted rows of the loaded `ids`"""
+        if self.registry is not None:
+            rows = (self.registry.row(row_id) for row_id in ids)
+            return sorted(row for row in rows if row is not None)
+
+        wanted = set(ids)
+        return [
+            row for row in range(self.rowCount()) if self.index(row, 0).data() in wanted
+        ]
+
+    def _execByIds(self, sql: str, ids: list, *values):
+        """
+        run `sql` once per chunk of ids, all in a single transaction;
+        `sql` has an {ids} placeholder, `values` are bound before the ids
+        """
+        db = self.database()
+        query = QSqlQuery(db=db)
+
+        db.transaction()
+        for chunk in chunked(ids):
+            query.prepare(sql.format(ids=", ".join("?" * len(chunk))))
+            for value in (*values, *chunk):
+                query.addBindValue(value)
+
+            if not query.exec():
+                logger.error(
+                    f"DB error on '{self.tableName()}': {query.lastError().text()}"
+                )
+                db.rollback()
+                return False
+
+        return db.commit()
+
+    def _refreshIds(self, ids: list):
+        """re-read the cached rows of `ids`, announced by a single dataChanged"""
+        rows = self.idRows(ids)
+        if not rows:
+            return
+
+        # one signal for the whole span instead of one per row
+        blocked = self.blockSignals(True)
+        try:
+            for row in rows:
+                self.selectRow(row)
+        finally:
+            self.blockSignals(blocked)
+
+        self.dataChanged.emit(
+            self.index(rows[0], 0),
+            self.index(rows[-1], self.columnCount() - 1),
+        )
+
+    def updateIds(self, field: str, value, ids: list):
+        """set `field` to `value` on rows by id, then patch the cached rows"""
+        if not ids:
+            return False
+
+        updated = self._execByIds(
+            f"UPDATE {self.tableName()} SET {field} = ? WHERE id IN ({{ids}})",
+            ids,
+            value,
+        )
+        if updated:
+            logger.info(f"Set '{field}' of {len(ids)} rows in '{self.tableName()}'")
+            self._refreshIds(ids)
+        return updated
+
+    def deleteIds(self, ids: list):
+        """delete rows by id, then refresh the model once"""
+        if not ids:
+            return False
+
+        deleted = self._execByIds(
+            f"DELETE FROM {self.tableName()} WHERE id IN ({{ids}})", ids
         )
+        if deleted:
+            logger.info(f"Deleted {len(ids)} rows from '{self.tableName()}'")
+        self.select()
+        return deleted
 
+    def deleteRows(self, rows):
+        """delete the given rows"""
+        return self.deleteIds(self.rowIds(rows))
+
+
+def insertRow(model: QSqlTableModel, row: int, values: dict):
+    """
+    insert one record through the model at `row`;
+    the id comes from lastInsertId and only the new row is read back
+    """
+    record = model.record()
+    # unset fields, like the primary key, are left to SQLite defaults
+    for col in range(record.count()):
+        record.setGenerated(col, False)
+    for field, value in values.items():
+        record.setValue(field, value)
+        record.setGenerated(field, True)
+
+    if model.insertRecord(row, record):
+        return True
+    # drop the failed row from the cache
+    model.revertAll()
+    return False
+
+
+class TopicsModel(BulkEditMixin, QSqlTableModel):
+    """table model class that reads and writes topics to a local file database"""
+
+    def __init__(self, db, **kwargs):
         super().__init__(db=db, **kwargs)
-        if created:
-            # set table name
-            self.setTable("topics")
-            logger.info("Table created and set to 'topics'")
-        else:
-            logger.error(
-                f"Table 'topics' was not created:\n{self._query.lastError().driverText()}"
-            )
+        # table is created by migrations
+        self.setTable("topics")
 
         # edit strategy
         self.setEditStrategy(QSqlTableModel.EditStrategy.OnFieldChange)
@@ -82,133 +359,323 @@ class TopicsModel(QSqlTableModel):
         # select
         self.select()
 
+        self.registry = Registry(self, self.fieldIndex("topic"))
+
+    def setEnabled(self, ids: list, enabled: bool):
+        """enable/disable notifications of topics by id"""
+        return self.updateIds("enabled", int(enabled), ids)
+
     def getTopics(self):
-        """prepare topics, and their details"""
-        # fetch all
-        while self.canFetchMore():
-            self.fetchMore()
-        # get the number of rows
-        row_count = self.rowCount()
-
-        now_dt = datetime.now(tz=TIMEZONE)
-
-        # create a list to store rows as tuples
-        topics_list: list[TopicData] = []
-        # iterate over each row and column to collect data
-        for row in range(row_count):
-            # get the QSqlRecord for the row
-            record = self.record(row)
-            topic_kw = {}
-            # extract row data
-            for c in range(record.count()):
-                value = record.value(c)
-                match c:
-                    case 0:
-                        topic_kw["topic_id"] = value
-                    case 1:
-                        topic_kw["created"] = datetime.strptime(
-                            value, "%Y-%m-%d %H:%M:%S"
-                        )
-                    case 2:
-                        # title
-                        topic_kw["title"] = value
-                    case 3:
-                        tm = time.strptime(value, "%H:%M:%S")
-                        topic_kw["starts"] = now_dt.replace(
-                            hour=tm.tm_hour,
-                            minute=tm.tm_min,
-                            second=tm.tm_sec,
-                        )
-                    case 4:
-                        tm = time.strptime(value, "%H:%M:%S")
-                        topic_kw["ends"] = now_dt.replace(
-                            hour=tm.tm_hour,
-                            minute=tm.tm_min,
-                            second=tm.tm_sec,
-                        )
-                    case 5:
-                        topic_kw["enabled"] = bool(value)
-                    case _:
-                        pass
-
-            topics_list.append(TopicData(**topic_kw))
-        # sort based on the starts
-        topics_list.sort(key=lambda t: t.starts)
-        return topics_list
+        """topics ordered by start; they start today"""
+        return readTopics(self.database(), today())
+
+    def _sortedRow(self, starts: str):
+        """row that keeps topics sorted by starts"""
+        col = self.fieldIndex("starts")
+        return bisect_right(
+            range(self.rowCount()),
+            starts,
+            key=lambda row: self.index(row, col).data(),
+        )
 
     def newTopic(self, time_now: str, topic: str, starts: str, ends: str, enabled: int):
         """add new topic to table"""
         if all((time_now, topic, starts, ends)):
-            self._query.prepare(
-                """
-                INSERT INTO topics (timestamp, topic, starts, ends, enabled)
-                VALUES (?, ?, ?, ?, ?)
-                """
-            )
-            self._query.addBindValue(time_now)
-            self._query.addBindValue(topic)
-            self._query.addBindValue(starts)
-            self._query.addBindValue(ends)
-            self._query.addBindValue(enabled)
-
-            if self._query.exec():
-                self.select()
+            values = {
+                "timestamp": time_now,
+                "topic": topic,
+                "starts": starts,
+                "ends": ends,
+                "enabled": enabled,
+            }
+            if insertRow(self, self._sortedRow(starts), values):
                 logger.info(f"Set topic '{topic}'")
                 return True
             else:
-                logger.error(
-                    f"DB error setting topic: {self._query.lastError().driverText()}"
-                )
+                logger.error(f"DB error setting topic: {self.lastError().text()}")
                 return False
 
 
-class NotesModel(QSqlRelationalTableModel):
-    """table model class that reads and writes notes to a local file database"""
+class NotesModel(BulkEditMixin, QAbstractTableModel):
+    """
+    table model class that reads and writes notes to a local file database;
+    rows are read in keyset-paginated pages as the view scrolls,
+    and only the most recently used pages are kept in memory
+    """
+
+    PAGE_SIZE = 256
+    """rows per page"""
+    MAX_PAGES = 64
+    """pages kept in memory"""
+
+    FIELDS = ("id", "timestamp", "topic_id", "note")
+    """columns; topic_id is displayed as the topic title"""
+
+    SORT_KEYS = {
+        "id": "notes.id",
+        "timestamp": "notes.timestamp",
+        "topic_id": "topics.topic",
+        "note": "notes.note",
+    }
+    """sql expression each column sorts by"""
+
+    SELECT = """
+        SELECT notes.id, notes.timestamp, topics.topic, notes.note, notes.topic_id
+        FROM notes JOIN topics ON topics.id = notes.topic_id
+        """
+    """row columns: FIELDS, with the title in place of topic_id, then topic_id"""
 
     def __init__(self, db, **kwargs):
+        super().__init__(**kwargs)
 
-        # create table if non-existent
+        self._db = db
+        # table is created by migrations
         self._query = QSqlQuery(db=db)
-        # returns True if success
-        created = self._query.exec(
-            """
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
-                topic_id INTEGER NOT NULL,
-                note TEXT NOT NULL,
-                FOREIGN KEY(topic_id) REFERENCES topics(id) ON DELETE CASCADE
+        # pages are copied out; the query need not cache them too
+        self._query.setForwardOnly(True)
+
+        # sort before select
+        self._sort_col = self.fieldIndex("timestamp")
+        self._order = Qt.SortOrder.DescendingOrder
+        # search matches, best first; None when not searching
+        self._ranked: list[int] | None = None
+
+        self.select()
+
+    def _resetPages(self):
+        self._head: list[tuple] = []
+        """rows added since the last select, newest first, shown above the pages"""
+        self._pages: OrderedDict[int, list[tuple]] = OrderedDict()
+        """loaded pages, least recently used first"""
+        self._cursors: list[tuple | None] = []
+        """(comparison, key) that starts each fetched page"""
+        self._last_keys: list[tuple] = []
+        """key of the last row of each fetched page"""
+        self._count = 0
+        """rows in fetched pages"""
+        self._exhausted = False
+
+    def _key(self, row: tuple):
+        """keyset key of a row: (sort value, id)"""
+        return (row[self._sort_col], row[0])
+
+    def _load(self, page: int):
+        """read `page` from the database"""
+        if self._ranked is not None:
+            ids = self._ranked[page * self.PAGE_SIZE : (page + 1) * self.PAGE_SIZE]
+            if not ids:
+                return []
+            self._query.prepare(
+                f"{self.SELECT} WHERE notes.id IN ({', '.join('?' * len(ids))})"
             )
-            """
+            for row_id in ids:
+                self._query.addBindValue(row_id)
+        else:
+            expr = self.SORT_KEYS[self.FIELDS[self._sort_col]]
+            desc = self._order == Qt.SortOrder.DescendingOrder
+            direction = "DESC" if desc else "ASC"
+
+            where = ""
+            if page < len(self._cursors) and (cursor := self._cursors[page]):
+                comparison, key = cursor
+                where = f"WHERE ({expr}, notes.id) {comparison} (?, ?)"
+            self._query.prepare(
+                f"""
+                {self.SELECT} {where}
+                ORDER BY {expr} {direction}, notes.id {direction}
+                LIMIT {self.PAGE_SIZE}
+                """
+            )
+            if where:
+                self._query.addBindValue(key[0])
+                self._query.addBindValue(key[1])
+
+        rows = []
+        if self._query.exec():
+            while self._query.next():
+                rows.append(self._values())
+            # end the read transaction; rows are cached
+            self._query.finish()
+        else:
+            logger.error(f"DB error reading notes: {self._query.lastError().text()}")
+
+        if self._ranked is not None:
+            # keep the rank order
+            ranks = {row_id: rank for rank, row_id in enumerate(ids)}
+            rows.sort(key=lambda row: ranks[row[0]])
+        return rows
+
+    def _page(self, page: int):
+        """rows of `page`, reading it again if it was evicted"""
+        if page in self._pages:
+            self._pages.move_to_end(page)
+        else:
+            self._pages[page] = self._load(page)
+            if len(self._pages) > self.MAX_PAGES:
+                self._pages.popitem(last=False)
+        return self._pages[page]
+
+    def _row(self, row: int):
+        if row < len(self._head):
+            return self._head[row]
+        row -= len(self._head)
+        page = self._page(row // self.PAGE_SIZE)
+        offset = row % self.PAGE_SIZE
+        if offset < len(page):
+            return page[offset]
+
+    def _readRow(self, row_id: int):
+        """read a single row by id"""
+        self._query.prepare(f"{self.SELECT} WHERE notes.id = ?")
+        self._query.addBindValue(row_id)
+        if self._query.exec() and self._query.next():
+            values = self._values()
+            self._query.finish()
+            return values
+
+    def _values(self):
+        """the row at the query's position"""
+        row_id, timestamp, title, note, topic_id = (
+            self._query.value(c) for c in range(5)
         )
+        # one title object per topic, not per row
+        return (row_id, timestamp, sys.intern(title), note, topic_id)
 
-        super().__init__(db=db, **kwargs)
-        if created:
-            # set table name
-            self.setTable("notes")
-            logger.info("Table created and set to 'notes'")
+    def _setRow(self, row: int, values: tuple):
+        if row < len(self._head):
+            self._head[row] = values
+            return
+        row -= len(self._head)
+        page, offset = divmod(row, self.PAGE_SIZE)
+        if page in self._pages:
+            self._pages[page][offset] = values
+
+    def database(self):
+        return self._db
+
+    def tableName(self):
+        return "notes"
+
+    def fieldIndex(self, name: str):
+        return self.FIELDS.index(name) if name in self.FIELDS else -1
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._head) + self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.FIELDS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            field = self.FIELDS[section]
+            return COMMENTS_HEADERS.get(field, field)
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex):
+        flags = super().flags(index)
+        if index.column() != self.fieldIndex("id"):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        if row := self._row(index.row()):
+            return row[index.column()]
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole):
+        """write one field; a topic is set by its id"""
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+
+        field = self.FIELDS[index.column()]
+        row_id = self.index(index.row(), 0).data()
+
+        self._query.prepare(f"UPDATE notes SET {field} = ? WHERE id = ?")
+        self._query.addBindValue(value)
+        self._query.addBindValue(row_id)
+        if not self._query.exec():
+            logger.error(f"DB error editing note: {self._query.lastError().text()}")
+            return False
+
+        if index.column() == self._sort_col:
+            # the row moved
+            self.select()
         else:
-            logger.error(
-                f"Table 'notes' was not created:\n{self._query.lastError().driverText()}"
+            self.selectRow(index.row())
+        return True
+
+    def selectRow(self, row: int):
+        """read one cached row again"""
+        if values := self._readRow(self.index(row, 0).data()):
+            self._setRow(row, values)
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, self.columnCount() - 1)
             )
+            return True
+        return False
 
-        # set relation
-        self.setRelation(
-            self.fieldIndex("topic_id"),
-            QSqlRelation("topics", "id", "topic"),
-        )
+    def canFetchMore(self, parent=QModelIndex()):
+        return not (parent.isValid() or self._exhausted)
 
-        # change header titles
-        for k, v in COMMENTS_HEADERS.items():
-            idx = self.fieldIndex(k)
-            self.setHeaderData(idx, Qt.Orientation.Horizontal, v)
+    def fetchMore(self, parent=QModelIndex()):
+        """read the next page"""
+        if parent.isValid() or self._exhausted:
+            return
 
-        # edit strategy
-        self.setEditStrategy(QSqlTableModel.EditStrategy.OnFieldChange)
+        page = len(self._cursors)
+        if page and self._ranked is None:
+            # continue after the last row of the previous page
+            desc = self._order == Qt.SortOrder.DescendingOrder
+            self._cursors.append(("<" if desc else ">", self._last_keys[-1]))
+        else:
+            self._cursors.append(None)
 
-        # sort before select
-        self.setSort(self.fieldIndex("timestamp"), Qt.SortOrder.DescendingOrder)
-        # select
+        rows = self._load(page)
+        if len(rows) < self.PAGE_SIZE:
+            self._exhausted = True
+        if not rows:
+            self._cursors.pop()
+            return
+
+        if page == 0 and self._ranked is None:
+            # pin the first page to its first row; newer rows go to the head
+            desc = self._order == Qt.SortOrder.DescendingOrder
+            self._cursors[0] = ("<=" if desc else ">=", self._key(rows[0]))
+
+        first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._pages[page] = rows
+        self._last_keys.append(self._key(rows[-1]))
+        self._count += len(rows)
+        self.endInsertRows()
+
+        if len(self._pages) > self.MAX_PAGES:
+            self._pages.popitem(last=False)
+
+    def select(self):
+        """forget loaded rows; the view fetches them again"""
+        self.beginResetModel()
+        self._resetPages()
+        self.endResetModel()
+        return True
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        """sort in the database, by `column` then id"""
+        self._sort_col = column
+        self._order = order
+        self.select()
+
+    def setRankedIds(self, ids: list[int] | None):
+        """show only `ids`, in that order; None shows all notes"""
+        self._ranked = ids
         self.select()
 
     def newNote(self, time_now: str, topic_id: int, notes: str):
@@ -223,166 +690,544 @@ class NotesModel(QSqlRelationalTableModel):
         self._query.addBindValue(topic_id)
         self._query.addBindValue(notes)
 
-        if self._query.exec():
-            self.select()
-            logger.info(f"Added note related to topic at'{topic_id}'")
-            return True
-        else:
+        if not self._query.exec():
             logger.error(
                 f"DB error adding notes: {self._query.lastError().driverText()}"
             )
             return False
 
+        logger.info(f"Added note related to topic at'{topic_id}'")
+        self.showInserted([self._query.lastInsertId()])
+        return True
+
+    def showInserted(self, ids: list[int]):
+        """show notes written to the table by id, oldest first"""
+        newest_first = (
+            self._ranked is None
+            and self._sort_col == self.fieldIndex("timestamp")
+            and self._order == Qt.SortOrder.DescendingOrder
+        )
+        if not (newest_first and self._cursors):
+            # nothing loaded yet, or the notes belong elsewhere; read lazily
+            self.select()
+            return
+
+        rows = [values for row_id in ids if (values := self._readRow(row_id))]
+        rows.sort(key=self._key)
+        # the head, then the pages, hold rows newer than the next
+        top = self._key(self._head[0]) if self._head else self._cursors[0][1]
+        for values in rows:
+            if self._key(values) <= top:
+                # already fetched, or back-dated into the pages
+                self.select()
+                return
+            top = self._key(values)
+
+        # newest note goes on top
+        for values in rows:
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self._head.insert(0, values)
+            self.endInsertRows()
+
+
+class ProblemsModel(BulkEditMixin, QAbstractTableModel):
+    """
+    table model class that reads and writes problems to a local file database;
+    rows are cached as columns: arrays of ints, and problem texts,
+    with topic titles shared through an id->title table
+    """
+
+    FIELDS = ("id", "timestamp", "problem", "topic_id", "solved")
+    """columns; topic_id is displayed as the topic title"""
 
-class ProblemsModel(QSqlRelationalTableModel):
-    """table model class that reads and writes problems to a local file database"""
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    ROW = """
+        SELECT CAST(strftime('%s', timestamp) AS INTEGER), problem, topic_id, solved
+        FROM problems WHERE id = ?
+        """
+    """(timestamp, problem, topic_id, solved) of one problem"""
 
     def __init__(self, db, **kwargs):
+        super().__init__(**kwargs)
 
-        # create table if non-existent
+        self._db = db
+        # table is created by migrations
         self._query = QSqlQuery(db=db)
-        # solved is number; 0=unsolved, 1=solved
-        created = self._query.exec(
-            """
-            CREATE TABLE IF NOT EXISTS problems (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
-                problem TEXT NOT NULL UNIQUE,
-                topic_id INTEGER NOT NULL,
-                solved INTEGER NOT NULL DEFAULT 0,
-                FOREIGN KEY(topic_id) REFERENCES topics(id) ON DELETE CASCADE
-            )
-            """
+        # rows are copied into the columns; the query need not cache them too
+        self._query.setForwardOnly(True)
+        self._topic_col = self.fieldIndex("topic_id")
+        self._worker = None
+        """database worker that selects run on; see setWorker"""
+
+        # sort before select
+        self._sort_col = self.fieldIndex("timestamp")
+        self._order = Qt.SortOrder.AscendingOrder
+
+        self._resetColumns()
+        self.select()
+
+        self.registry = Registry(self, self.fieldIndex("problem"))
+
+    def _resetColumns(self):
+        self._ids = array("q")
+        self._times = array("q")
+        """seconds since EPOCH"""
+        self._problems: list[str] = []
+        self._topic_ids = array("q")
+        self._solved = array("b")
+        self._titles: dict[int, str] = {}
+        """topic id -> title"""
+
+    def _columns(self):
+        """columns in FIELDS order"""
+        return (
+            self._ids,
+            self._times,
+            self._problems,
+            self._topic_ids,
+            self._solved,
         )
 
-        super().__init__(db=db, **kwargs)
-        if created:
-            # set table name
-            self.setTable("problems")
-            logger.info("Table created and set to 'problems'")
-        else:
-            logger.error(
-                f"Table 'problems' was not created:\n{self._query.lastError().driverText()}"
+    def _loadTitles(self):
+        titles = {}
+        if self._query.exec("SELECT id, topic FROM topics"):
+            while self._query.next():
+                titles[self._query.value(0)] = sys.intern(self._query.value(1))
+            self._query.finish()
+        return titles
+
+    def sortKeys(self, column: int):
+        """typed sort key of every row in `column`: ints, or casefolded text"""
+        if column == self._topic_col:
+            titles = {i: title.casefold() for i, title in self._titles.items()}
+            return [titles.get(topic_id, "") for topic_id in self._topic_ids]
+        if column == self.fieldIndex("problem"):
+            return [problem.casefold() for problem in self._problems]
+        # ids, seconds and solved flags
+        return self._columns()[column]
+
+    def _arrange(self):
+        """put the columns in sort order, then id"""
+        keys, ids = self.sortKeys(self._sort_col), self._ids
+        self._permute(
+            sorted(
+                range(len(ids)),
+                key=lambda i: (keys[i], ids[i]),
+                reverse=self._order == Qt.SortOrder.DescendingOrder,
             )
+        )
+
+    def _permute(self, order: list[int]):
+        """row i becomes the row that was at order[i]"""
+        if len(order) < 2:
+            # itemgetter of one index returns the item, not a tuple
+            return
+        gather = itemgetter(*order)
+        self._ids = array("q", gather(self._ids))
+        self._times = array("q", gather(self._times))
+        self._problems = list(gather(self._problems))
+        self._topic_ids = array("q", gather(self._topic_ids))
+        self._solved = array("b", gather(self._solved))
 
-        # set relation
-        self.setRelation(
-            self.fieldIndex("topic_id"),
-            QSqlRelation("topics", "id", "topic"),
+    def reorder(self, order: list[int]):
+        """move the cached rows, without reading them again; see _permute"""
+        self.layoutAboutToBeChanged.emit()
+        moved_to = [0] * len(order)
+        for new_row, old_row in enumerate(order):
+            moved_to[old_row] = new_row
+        self._permute(order)
+
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(moved_to[i.row()], i.column()) for i in persistent],
         )
+        self.layoutChanged.emit()
 
-        # edit strategy
-        self.setEditStrategy(QSqlTableModel.EditStrategy.OnFieldChange)
-        # sort before select
-        self.setSort(self.fieldIndex("timestamp"), Qt.SortOrder.AscendingOrder)
+    def _readRow(self, row_id: int):
+        """(timestamp, problem, topic_id, solved) of a single row by id"""
+        self._query.prepare(self.ROW)
+        self._query.addBindValue(row_id)
+        if self._query.exec() and self._query.next():
+            values = tuple(self._query.value(c) for c in range(4))
+            self._query.finish()
+            return values
 
-        # change header titles
-        for k, v in PROBLEMS_HEADERS.items():
-            idx = self.fieldIndex(k)
-            self.setHeaderData(idx, Qt.Orientation.Horizontal, v)
+    def database(self):
+        return self._db
 
-        # select
-        self.select()
+    def tableName(self):
+        return "problems"
 
-    def _idToRow(self, problem_id: int):
-        """get row number from problem_id"""
-
-        for row in range(self.rowCount()):
-            # get the QSqlRecord for the row
-            record = self.record(row)
-            # extract row data
-            if record.value(0) == problem_id:
-                return row
-
-    def getProblems(self):
-        """create problems data"""
-
-        # fetch all
-        while self.canFetchMore():
-            self.fetchMore()
-        # get the number of rows
-        row_count = self.rowCount()
-
-        # create a list to store rows as ProblemData instances
-        problems_list: list[ProblemData] = []
-        # iterate over each row and column to collect data
-        for row in range(row_count):
-            # get the QSqlRecord for the row
-            record = self.record(row)
-            problem_kw = {}
-            # extract row data
-            for c in range(record.count()):
-                value = record.value(c)
-                match c:
-                    case 0:
-                        problem_kw["problem_id"] = value
-                    case 1:
-                        problem_kw["created"] = datetime.strptime(
-                            value, "%Y-%m-%d %H:%M:%S"
-                        )
-                    case 2:
-                        problem_kw["problem"] = value
-                    case 3:
-                        problem_kw["topic_id"] = value
-                    case 4:
-                        problem_kw["solved"] = bool(value)
-                    case _:
-                        pass
-
-            problems_list.append(ProblemData(**problem_kw))
-
-        problems_list.sort(key=lambda p: p.created)
-        return problems_list
-
-    def newProblem(self, timestamp: str, topic_id: int, problem: str):
-        """add new problem to table"""
-
-        # create a new row in the model
-        self._query.prepare(
-            """
-            INSERT INTO problems (timestamp, problem, topic_id)
-            VALUES (?, ?, ?)
-            """
-        )
-        self._query.addBindValue(timestamp)
-        self._query.addBindValue(problem)
-        self._query.addBindValue(topic_id)
+    def fieldIndex(self, name: str):
+        return self.FIELDS.index(name) if name in self.FIELDS else -1
 
-        if self._query.exec():
-            logger.info("Added new problem to table")
-            self.select()
-            return True
-        else:
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.FIELDS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            field = self.FIELDS[section]
+            return PROBLEMS_HEADERS.get(field, field)
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex):
+        flags = super().flags(index)
+        if index.column() != self.fieldIndex("id"):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def index(self, row: int, column: int, parent=QModelIndex()):
+        # skips the rowCount and columnCount calls of hasIndex
+        if parent.isValid() or not (
+            0 <= row < len(self._ids) and 0 <= column < len(self.FIELDS)
+        ):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        row, column = index.row(), index.column()
+        if not 0 <= row < len(self._ids):
+            return None
+
+        if column == self._topic_col:
+            return self._titles.get(self._topic_ids[row])
+        if column == 1:
+            # seconds since EPOCH, which is naive; no zone to apply
+            return time.strftime(self.TIME_FORMAT, time.gmtime(self._times[row]))
+        return self._columns()[column][row]
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole):
+        """write one field; a topic is set by its id"""
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+
+        field = self.FIELDS[index.column()]
+        self._query.prepare(f"UPDATE problems SET {field} = ? WHERE id = ?")
+        self._query.addBindValue(value)
+        self._query.addBindValue(self._ids[index.row()])
+        if not self._query.exec():
             logger.error(
-                f"DB error adding problem: {self._query.lastError().driverText()}"
+                f"DB error editing problem: {self._query.lastError().text()}"
             )
             return False
 
-    def markSolved(self, problem_id: int):
-        """mark old problem as solved if exists"""
+        self.selectRow(index.row())
+        return True
 
-        self._query.prepare("UPDATE problems SET solved = 1 WHERE id = ?")
-        self._query.addBindValue(problem_id)
+    def selectRow(self, row: int):
+        """read one cached row again"""
+        values = self._readRow(self._ids[row])
+        if values is None:
+            return False
 
-        if self._query.exec():
-            logger.info(f"Problem at '{problem_id}' marked as solved")
-            self.select()
-            return True
+        timestamp, self._problems[row], topic_id, self._solved[row] = values
+        self._times[row] = timestamp or 0
+        self._topic_ids[row] = topic_id
+        if topic_id not in self._titles:
+            self._titles = self._loadTitles()
+        self.dataChanged.emit(
+            self.index(row, 0), self.index(row, self.columnCount() - 1)
+        )
+        return True
+
+    def columnValues(self, column: int):
+        """the display values of `column`, in row order"""
+        if column == self._topic_col:
+            return [self._titles.get(topic_id) for topic_id in self._topic_ids]
+        if column == 1:
+            return [
+                time.strftime(self.TIME_FORMAT, time.gmtime(seconds))
+                for seconds in self._times
+            ]
+        return self._columns()[column]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        # every row is read by select
+        return False
+
+    def setWorker(self, worker):
+        """read the problems on the database `worker` from now on"""
+        self._worker = worker
+
+    def select(self):
+        """
+        read every problem, with one query for the rows and one for the titles;
+        with a worker, the rows are read there and shown once they arrive
+        """
+        if self._worker is None:
+            self._setColumns(readProblemColumns(self._db))
         else:
-            logger.error(
-                f"DB error marking problem as solved: {self._query.lastError().driverText()}"
-            )
-            return False
+            job = self._worker.submit(readProblemColumns)
+            job.done.connect(self._setColumns)
+        return True
+
+    def _setColumns(self, result: tuple):
+        """swap in the columns read by readProblemColumns"""
+        titles, (ids, times, problems, topic_ids, solved) = result
+        self.beginResetModel()
+        self._titles = titles
+        self._ids = array("q", ids)
+        self._times = array("q", (t or 0 for t in times))
+        self._problems = problems
+        self._topic_ids = array("q", topic_ids)
+        self._solved = array("b", solved)
+
+        if self._sort_col != self.fieldIndex("timestamp") or (
+            self._order != Qt.SortOrder.AscendingOrder
+        ):
+            # the query reads oldest first
+            self._arrange()
+        self.endResetModel()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        """sort the cached columns by `column` then id"""
+        self._sort_col = column
+        self._order = order
+        # rows move; like a select, without reading them again
+        self.beginResetModel()
+        self._arrange()
+        self.endResetModel()
+
+    def getProblems(self, unsolved_only: bool = False):
+        """problems, oldest first"""
+        return readProblems(self.database(), unsolved_only)
+
+    def setSolved(self, ids: list, solved: bool):
+        """mark problems by id as solved/unsolved"""
+        return self.updateIds("solved", int(solved), ids)
+
+    def showInserted(self, ids: list[int]):
+        """show problems written to the table by id; the newest go last"""
+        for row_id in ids:
+            if self.registry.row(row_id) is not None:
+                continue
+            values = self._readRow(row_id)
+            if values is None:
+                continue
+
+            row = len(self._ids)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._ids.append(row_id)
+            self._times.append(values[0] or 0)
+            self._problems.append(values[1])
+            self._topic_ids.append(values[2])
+            self._solved.append(values[3])
+            if values[2] not in self._titles:
+                self._titles = self._loadTitles()
+            self.endInsertRows()
+
+    def showUpdated(self, ids: list[int]):
+        """show problems updated in the table by id"""
+        self._refreshIds(ids)
+
+
+def sortKey(value):
+    """
+    typed sort key of a cell: numbers as they are, time stamps as epoch seconds,
+    other text casefolded; empty cells first, then numbers, then text
+    """
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    text = str(value)
+    if len(text) == 19 and text[4] == "-" and text[10] == " ":
+        try:
+            return (1, (datetime.fromisoformat(text) - EPOCH) // timedelta(seconds=1))
+        except ValueError:
+            pass
+    return (2, text.casefold())
+
+
+def denseRanks(keys):
+    """rank of each key in sort order; equal keys share a rank"""
+    ranks = [0] * len(keys)
+    rank, previous = 0, object()
+    for row in sorted(range(len(keys)), key=keys.__getitem__):
+        if keys[row] != previous:
+            rank, previous = rank + 1, keys[row]
+        ranks[row] = rank
+    return ranks
 
 
 class SearchableModel(QSortFilterProxyModel):
-    """model that can filter all columns"""
+    """
+    model that can filter all columns;
+    sorts cached rows in memory, breaking ties by the previous header clicks
+    """
+
+    SORT_DEPTH = 3
+    """header clicks a sort remembers"""
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
         self.setFilterKeyColumn(-1)
 
-    def sort(self, column, order):
-        """use source model's sort"""
-        self.sourceModel().sort(column, order)
+        self._index = None
+        self._table = ""
+        self._ranks: dict[int, int] | None = None
+        """rank of every matching id, None when not searching the index"""
+
+        self._sorts: list[tuple[int, Qt.SortOrder]] = []
+        """(column, order) of the header clicks, latest first"""
+        self._sort_keys: list[tuple] | None = None
+        """per source row, for lessThan; None until needed again"""
+
+    def setSourceModel(self, model):
+        # connected first, so the keys are dropped before the proxy re-sorts
+        for signal in (
+            model.modelReset,
+            model.rowsInserted,
+            model.rowsRemoved,
+            model.dataChanged,
+            model.layoutChanged,
+        ):
+            signal.connect(self._dropSortKeys)
+        super().setSourceModel(model)
+        # a select puts the rows back in the source's order
+        model.modelReset.connect(self._applySort)
+
+    def _dropSortKeys(self, *args):
+        self._sort_keys = None
+
+    def _columnKeys(self, column: int):
+        """typed sort keys of the source's `column`, one per row"""
+        source = self.sourceModel()
+        if hasattr(source, "sortKeys"):
+            return source.sortKeys(column)
+        return [
+            sortKey(source.index(row, column).data())
+            for row in range(source.rowCount())
+        ]
+
+    def _buildSortKeys(self):
+        """rank tuples for lessThan; later clicks break ties in their own order"""
+        primary_order = self._sorts[0][1]
+        columns = []
+        for column, order in self._sorts:
+            ranks = denseRanks(self._columnKeys(column))
+            if order != primary_order:
+                # lessThan is read backwards for a descending primary sort
+                ranks = [-rank for rank in ranks]
+            columns.append(ranks)
+        return list(zip(*columns))
+
+    def _applySort(self):
+        """sort by the remembered clicks; rank order while searching"""
+        source = self.sourceModel()
+        if hasattr(source, "setRankedIds"):
+            # sorted and ranked by the source
+            return
+        if self._ranks is not None:
+            QSortFilterProxyModel.sort(self, 0)
+        elif not self._sorts or source is None:
+            QSortFilterProxyModel.sort(self, -1)
+        elif hasattr(source, "reorder"):
+            # stable sorts from the last click to the latest
+            order = list(range(source.rowCount()))
+            for column, sort_order in reversed(self._sorts):
+                keys = self._columnKeys(column)
+                order.sort(
+                    key=keys.__getitem__,
+                    reverse=sort_order == Qt.SortOrder.DescendingOrder,
+                )
+            QSortFilterProxyModel.sort(self, -1)
+            source.reorder(order)
+        else:
+            self._sort_keys = None
+            QSortFilterProxyModel.sort(self, *self._sorts[0])
+
+    def setSearchIndex(self, index, table: str):
+        """answer searches with the full-text index of `table`"""
+        self._index = index
+        self._table = table
+
+    def search(self, text: str):
+        """show rows matching text, best matches first"""
+        source = self.sourceModel()
+        if self._index and self._index.available:
+            ranks = self._index.match(self._table, text) if text.strip() else None
+            if hasattr(source, "setRankedIds"):
+                # the source pages through the matches itself
+                source.setRankedIds(None if ranks is None else list(ranks))
+                return
+        elif hasattr(source, "columnValues"):
+            ranks = self._scan(text) if text else None
+        else:
+            self.setFilterFixedString(text)
+            return
+
+        self._ranks = ranks
+        self.invalidateRowsFilter()
+        # order by rank while searching, by the header clicks otherwise
+        self._applySort()
+
+    def _scan(self, text: str):
+        """
+        ids of the source's rows with `text` in any column, in row order;
+        reads whole columns instead of making a data() call per cell
+        """
+        source = self.sourceModel()
+        needle = text.casefold()
+        columns = [source.columnValues(c) for c in range(source.columnCount())]
+        ids = columns[0]
+        matches = (
+            row_id
+            for row, row_id in enumerate(ids)
+            if any(needle in str(column[row]).casefold() for column in columns)
+        )
+        return {row_id: rank for rank, row_id in enumerate(matches)}
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._ranks is None:
+            # called for every row on each re-sort; skip the filter when unset
+            if not self.filterRegularExpression().pattern():
+                return True
+            return super().filterAcceptsRow(source_row, source_parent)
+        # column 0 is the primary key
+        source = self.sourceModel()
+        if hasattr(source, "columnValues"):
+            row_id = source.columnValues(0)[source_row]
+        else:
+            row_id = source.index(source_row, 0, source_parent).data()
+        return row_id in self._ranks
+
+    def lessThan(self, left, right):
+        if self._ranks is not None:
+            return self._ranks[left.data()] < self._ranks[right.data()]
+        if not self._sorts:
+            return super().lessThan(left, right)
+        if self._sort_keys is None:
+            self._sort_keys = self._buildSortKeys()
+        return self._sort_keys[left.row()] < self._sort_keys[right.row()]
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """
+        sort cached rows in memory, ties kept in the previous sort's order;
+        a paged source sorts in the database instead
+        """
+        source = self.sourceModel()
+        if hasattr(source, "setRankedIds"):
+            source.sort(column, order)
+            return
+        if column < 0:
+            self._sorts = []
+        else:
+            previous = [s for s in self._sorts if s[0] != column]
+            self._sorts = [(column, order), *previous][: self.SORT_DEPTH]
+        self._applySort()
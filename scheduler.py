@@ -0,0 +1,96 @@
+"""single-shot timers for topic boundaries and reminders"""
+
+import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal
+from datastructures.datas import TopicData
+from constants import TIMEZONE
+
+
+logger = logging.getLogger(__name__)
+
+DAY = timedelta(days=1)
+
+
+class NotificationScheduler(QObject):
+    """
+    wakes the app when a topic starts or ends and when a reminder is due,
+    instead of polling on a fixed interval
+    """
+
+    boundaryReached = pyqtSignal()
+    """emitted when a topic starts or ends"""
+    reminderDue = pyqtSignal()
+    """emitted every interval while reminding"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._boundaries: list[datetime] = []
+        """sorted topic starts and ends"""
+        self._next: datetime | None = None
+        """boundary the boundary timer is armed for"""
+        self._interval = 0
+        """reminder interval in msecs"""
+
+        self._boundary_timer = QTimer(self)
+        self._boundary_timer.setSingleShot(True)
+        self._boundary_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._boundary_timer.timeout.connect(self._onBoundary)
+
+        self._reminder_timer = QTimer(self)
+        self._reminder_timer.setSingleShot(True)
+        self._reminder_timer.timeout.connect(self._onReminder)
+
+    def setInterval(self, minutes: int):
+        """set the time between reminders"""
+        self._interval = minutes * 60000
+        if self._reminder_timer.isActive():
+            self._reminder_timer.start(self._interval)
+
+    def setTopics(self, topics: list[TopicData]):
+        """
+        precompute the day's boundaries and arm for the next one;
+        set the next day's topics after midnight
+        """
+        boundaries = {t.starts for t in topics} | {t.ends for t in topics}
+        # a topic ending the next day also ends today, from the night before
+        boundaries |= {t.ends - DAY for t in topics if t.ends.date() != t.starts.date()}
+        self._boundaries = sorted(boundaries)
+        self._armBoundary()
+
+    def setReminding(self, remind: bool):
+        """(re)start or stop the reminder timer"""
+        if remind and self._interval:
+            self._reminder_timer.start(self._interval)
+        else:
+            self._reminder_timer.stop()
+
+    def _armBoundary(self):
+        now = datetime.now(tz=TIMEZONE)
+        index = bisect_right(self._boundaries, now)
+
+        if index == len(self._boundaries):
+            # nothing left today
+            self._next = None
+            self._boundary_timer.stop()
+            return
+
+        self._next = self._boundaries[index]
+        msecs = (self._next - now) // timedelta(milliseconds=1) + 1
+        self._boundary_timer.start(msecs)
+        logger.info(f"Next topic boundary at {self._next:%H:%M:%S}")
+
+    def _onBoundary(self):
+        if datetime.now(tz=TIMEZONE) < self._next:
+            # woke up early
+            self._armBoundary()
+            return
+
+        self.boundaryReached.emit()
+        self._armBoundary()
+
+    def _onReminder(self):
+        self.reminderDue.emit()
+        self.setReminding(True)
@@ -0,0 +1,96 @@
+"""SQLite FTS5 full-text index for the searchable tables"""
+
+import logging
+from PyQt6.QtSql import QSqlQuery
+
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLES = ("notes", "topics", "problems")
+"""tables with a full-text index, `<table>_fts`; see migration 5"""
+
+TOPIC_TABLES = ("notes", "problems")
+"""tables shown with their topic's title, which searches also match"""
+
+TIME_COLUMNS = {
+    # table: columns of HH:MM:SS times
+    "topics": ("starts", "ends"),
+}
+
+
+def ftsQuery(text: str):
+    """turn user input into an FTS5 query; every word is a quoted prefix"""
+    words = text.split()
+    return " ".join('"{}"*'.format(w.replace('"', '""')) for w in words)
+
+
+class SearchIndex:
+    """
+    external-content FTS5 tables over the searchable text columns;
+    created, and kept in sync with their source tables, by migration 5
+    """
+
+    def __init__(self, db):
+        self._query = QSqlQuery(db=db)
+        self.available = all(self._exists(f"{table}_fts") for table in FTS_TABLES)
+        """False if this SQLite build has no FTS5 and the migration failed"""
+
+        if not self.available:
+            logger.error("FTS5 not available: searches fall back to proxy filtering")
+
+    def _exists(self, name: str):
+        """check if table `name` exists"""
+        self._query.prepare(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+        )
+        self._query.addBindValue(name)
+        exists = self._query.exec() and self._query.next()
+        # an active statement would hold the GUI connection's read snapshot
+        self._query.finish()
+        return exists
+
+    def _rank(self, ranks: dict, sql: str, *values):
+        """add the ids `sql` selects to `ranks`, after those already in it"""
+        self._query.prepare(sql)
+        for value in values:
+            self._query.addBindValue(value)
+
+        if self._query.exec():
+            while self._query.next():
+                ranks.setdefault(self._query.value(0), len(ranks))
+        else:
+            logger.error(f"FTS match error: {self._query.lastError().driverText()}")
+
+    def match(self, table: str, text: str):
+        """
+        return {id: rank position} of rows in `table` matching `text`, best first;
+        rows whose own text matches come before those matched by topic title or time
+        """
+        fts = f"{table}_fts"
+        query = ftsQuery(text)
+        ranks = {}
+        self._rank(
+            ranks, f"SELECT rowid FROM {fts} WHERE {fts} MATCH ? ORDER BY rank", query
+        )
+
+        if table in TOPIC_TABLES:
+            self._rank(
+                ranks,
+                f"""
+                SELECT id FROM {table} WHERE topic_id IN (
+                    SELECT rowid FROM topics_fts WHERE topics_fts MATCH ?
+                )
+                ORDER BY id
+                """,
+                query,
+            )
+
+        if columns := TIME_COLUMNS.get(table):
+            # times are matched from their start, like "09" or "09:30"
+            where = " OR ".join(f"{column} LIKE ? || '%'" for column in columns)
+            self._rank(
+                ranks,
+                f"SELECT id FROM {table} WHERE {where} ORDER BY id",
+                *(text.strip() for _ in columns),
+            )
+        return ranks
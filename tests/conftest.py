@@ -0,0 +1,55 @@
+"""shared fixtures; the tests run headless from the repo root"""
+
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+from database import openDatabase
+from migrations import migrate
+from constants import DEFAULT_SETTINGS
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "app.sqlite")
+
+
+@pytest.fixture
+def db(qapp, db_path):
+    """migrated default connection to a new database"""
+    db = openDatabase(db_path, DEFAULT_SETTINGS["db_profile"])
+    assert migrate(db)
+    yield db
+    db.close()
+    del db
+    QSqlDatabase.removeDatabase("qt_sql_default_connection")
+
+
+def execute(db: QSqlDatabase, sql: str, *values):
+    """run one statement on db, failing the test if it errors"""
+    query = QSqlQuery(db=db)
+    query.prepare(sql)
+    for value in values:
+        query.addBindValue(value)
+    assert query.exec(), query.lastError().text()
+    return query
+
+
+def waitFor(predicate, timeout: int = 5000):
+    """run the event loop until predicate() is true, or `timeout` msecs pass"""
+    for _ in range(timeout // 10):
+        if predicate():
+            return True
+        QTest.qWait(10)
+    return predicate()
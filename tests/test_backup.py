@@ -0,0 +1,194 @@
+import gzip
+import sqlite3
+from contextlib import closing
+from backup import (
+    IDLE_SECS,
+    BackupScheduler,
+    BackupWorker,
+    IncrementalBackupWorker,
+    RestoreWorker,
+    check,
+    commitBackup,
+    lastBackup,
+    replay,
+)
+from conftest import execute, waitFor
+from constants import DEFAULT_SETTINGS
+from dbworker import DatabaseWorker
+
+
+def count(conn: sqlite3.Connection, table: str):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_backup_is_copied_out_of_process_and_logged_in_the_live_database(
+    db, db_path, tmp_path
+):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) "
+        "VALUES ('2024-01-01 00:00:00', 'maths', '09:00:00', '10:00:00')",
+    )
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+
+    worker = BackupWorker(db_path, str(backup_dir))
+    worker.setAutoDelete(False)
+    backed_up, progress, errors = [], [], []
+    worker.signals.backedUp.connect(lambda *args: backed_up.append(args))
+    worker.signals.progress.connect(progress.append)
+    worker.signals.errored.connect(errors.append)
+    worker.run()
+    assert not errors
+    assert progress[-1] == 100
+
+    dest = str(backup_dir / "app.sqlite")
+    assert backed_up == [("full", dest, 1)]
+    with closing(sqlite3.connect(dest)) as conn:
+        # the row was still in the live database's WAL
+        assert count(conn, "topics") == 1
+        assert lastBackup(conn) == 1
+
+    commitBackup(db, *backed_up[0])
+    query = execute(db, "SELECT COUNT(*) FROM changelog")
+    assert query.next() and query.value(0) == 0
+    query = execute(db, "SELECT kind, path, seq FROM backup_log")
+    assert query.next()
+    assert [query.value(i) for i in range(3)] == ["full", dest, 1]
+
+
+def runWorker(worker):
+    """run a backup worker on this thread; (backedUp args, errors)"""
+    worker.setAutoDelete(False)
+    backed_up, errors = [], []
+    worker.signals.backedUp.connect(lambda *args: backed_up.append(args))
+    worker.signals.errored.connect(errors.append)
+    worker.run()
+    assert not errors
+    return backed_up
+
+
+def test_changes_are_read_through_qt_and_replay_onto_the_snapshot(
+    db, db_path, tmp_path
+):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) "
+        "VALUES ('2024-01-01 00:00:00', 'maths', '09:00:00', '10:00:00')",
+    )
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    (full,) = runWorker(BackupWorker(db_path, str(backup_dir)))
+    commitBackup(db, *full)
+
+    for i in range(3):
+        execute(
+            db,
+            "INSERT INTO notes (timestamp, topic_id, note) "
+            "VALUES ('2024-01-02 09:30:00', 1, ?)",
+            f"note {i}",
+        )
+    execute(db, "DELETE FROM notes WHERE id = 2")
+    execute(db, "UPDATE topics SET topic = 'algebra' WHERE id = 1")
+
+    (incremental,) = runWorker(IncrementalBackupWorker(db_path, str(backup_dir)))
+    kind, path, upto = incremental
+    assert (kind, upto) == ("incremental", 6)
+    # pruned once the worker logs it
+    commitBackup(db, *incremental)
+    query = execute(db, "SELECT COUNT(*) FROM changelog")
+    assert query.next() and query.value(0) == 0
+
+    replay(full[1], [path])
+    with closing(sqlite3.connect(full[1])) as conn:
+        assert conn.execute("SELECT id, note FROM notes").fetchall() == [
+            (1, "note 0"),
+            (3, "note 2"),
+        ]
+        assert conn.execute("SELECT topic FROM topics").fetchall() == [("algebra",)]
+        assert lastBackup(conn) == 6
+
+
+def liveCount(db, table: str):
+    query = execute(db, f"SELECT COUNT(*) FROM {table}")
+    assert query.next()
+    return query.value(0)
+
+
+def test_scheduled_backup_is_logged_by_the_database_worker(db, db_path, tmp_path):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) "
+        "VALUES ('2024-01-01 00:00:00', 'maths', '09:00:00', '10:00:00')",
+    )
+    for i in range(10):
+        execute(
+            db,
+            "INSERT INTO notes (timestamp, topic_id, note) "
+            "VALUES ('2024-01-02 09:30:00', 1, ?)",
+            f"note {i}",
+        )
+    assert liveCount(db, "changelog") == 11
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+
+    worker = DatabaseWorker(db_path, DEFAULT_SETTINGS["db_profile"])
+    try:
+        scheduler = BackupScheduler(worker, str(backup_dir))
+        # the user has been away long enough
+        scheduler._last_input -= IDLE_SECS
+        scheduler._onDue()
+        assert waitFor(
+            lambda: not scheduler._running and not liveCount(db, "changelog"),
+            timeout=20000,
+        )
+    finally:
+        worker.close()
+
+    (dest,) = backup_dir.glob("app-*.sqlite.gz")
+    query = execute(db, "SELECT kind, path, seq FROM backup_log")
+    assert query.next()
+    assert [query.value(i) for i in range(3)] == ["full", str(dest), 11]
+
+    # the compressed copy knows it is the base too
+    restored = tmp_path / "restored.sqlite"
+    with gzip.open(dest) as file:
+        restored.write_bytes(file.read())
+    with closing(sqlite3.connect(restored)) as conn:
+        assert lastBackup(conn) == 11
+        assert count(conn, "notes") == 10
+
+
+def test_restore_replaces_the_closed_database_out_of_process(db, db_path, tmp_path):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) "
+        "VALUES ('2024-01-01 00:00:00', 'maths', '09:00:00', '10:00:00')",
+    )
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    (full,) = runWorker(BackupWorker(db_path, str(backup_dir)))
+    commitBackup(db, *full)
+    execute(db, "UPDATE topics SET topic = 'algebra' WHERE id = 1")
+
+    db.close()
+    worker = RestoreWorker(full[1], db_path)
+    progress = []
+    worker.signals.progress.connect(progress.append)
+    runWorker(worker)
+    assert db.open()
+
+    assert progress[-1] == 100
+    query = execute(db, "SELECT topic FROM topics")
+    assert query.next() and query.value(0) == "maths"
+    # not the base of later incremental backups
+    assert liveCount(db, "backup_log") == 0
+
+
+def test_check_paths_with_uri_characters(tmp_path):
+    for name in ("what?.sqlite", "#1.sqlite", "100%.sqlite", "a b.sqlite"):
+        path = tmp_path / name
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute("CREATE TABLE t (x)")
+        assert check(str(path)) == []
+        assert check(str(path), full=True) == []
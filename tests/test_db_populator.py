@@ -0,0 +1,86 @@
+import sqlite3
+import subprocess
+import sys
+from contextlib import closing
+import pytest
+import db_populator
+from migrations import migrateConnection
+
+
+def test_timestamp_span_is_utc():
+    # 2020-01-01 and 2026-01-01 at 00:00 UTC
+    assert db_populator.TIMESTAMP_SPAN == (1577836800, 1767225600)
+
+
+def test_seed_gives_the_same_rows_in_every_time_zone(tmp_path):
+    dumps = []
+    for tz in ("UTC", "America/New_York"):
+        path = tmp_path / f"{tz.replace('/', '-')}.sqlite"
+        subprocess.run(
+            [
+                sys.executable,
+                db_populator.__file__,
+                f"--db={path}",
+                "--topics=5",
+                "--notes=20",
+                "--problems=5",
+                "--workers=1",
+            ],
+            env={"TZ": tz, "PATH": ""},
+            check=True,
+        )
+        with closing(sqlite3.connect(path)) as conn:
+            dumps.append(conn.execute("SELECT * FROM notes").fetchall())
+    assert dumps[0] == dumps[1]
+
+
+def test_load_is_not_change_logged(tmp_path):
+    with closing(sqlite3.connect(tmp_path / "load.sqlite")) as conn:
+        migrateConnection(conn)
+        triggers = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+        ).fetchall()
+
+        db_populator._init(db_populator.vocabulary(0))
+        db_populator.populate(conn, map, 0, 5, 20, 5)
+
+        assert conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 20
+        assert conn.execute("SELECT COUNT(*) FROM changelog").fetchone()[0] == 0
+        # the triggers are back for the app's own writes
+        assert (
+            conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+                "ORDER BY name"
+            ).fetchall()
+            == triggers
+        )
+        with conn:
+            conn.execute("DELETE FROM notes WHERE id = 1")
+        assert conn.execute("SELECT COUNT(*) FROM changelog").fetchone()[0] == 1
+
+
+def test_second_load_adds_to_the_first(tmp_path):
+    with closing(sqlite3.connect(tmp_path / "load.sqlite")) as conn:
+        migrateConnection(conn)
+        db_populator._init(db_populator.vocabulary(0))
+        for _ in range(2):
+            db_populator.populate(conn, map, 0, 5, 20, 5)
+
+        assert conn.execute("SELECT COUNT(*) FROM topics").fetchone()[0] == 10
+        assert conn.execute("SELECT COUNT(*) FROM problems").fetchone()[0] == 10
+        # the full-text indexes cover the loaded rows
+        assert conn.execute("SELECT COUNT(*) FROM notes_fts").fetchone()[0] == 40
+        word = conn.execute("SELECT note FROM notes WHERE id = 33").fetchone()[0]
+        word = word.split()[0].strip(".,")
+        assert 33 in [
+            row[0]
+            for row in conn.execute(
+                "SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?", (f'"{word}"',)
+            )
+        ]
+
+
+def test_cli_requires_a_database(capsys):
+    with pytest.raises(SystemExit):
+        db_populator.main(["--topics=1"])
+    assert "--db" in capsys.readouterr().err
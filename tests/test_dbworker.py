@@ -0,0 +1,149 @@
+import threading
+import pytest
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+from conftest import execute, waitFor
+from constants import DEFAULT_SETTINGS
+from database import applyProfile
+from dbworker import CONNECTION, DatabaseWorker
+from models import ProblemsModel, readProblemColumns
+
+
+@pytest.fixture
+def worker(db, db_path):
+    worker = DatabaseWorker(db_path, DEFAULT_SETTINGS["db_profile"])
+    yield worker
+    worker.close()
+
+
+def addTopic(db):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+        "2024-01-01 00:00:00",
+        "maths",
+        "09:00:00",
+        "10:00:00",
+    )
+
+
+def addProblem(db, problem: str):
+    execute(
+        db,
+        "INSERT INTO problems (timestamp, problem, topic_id) VALUES (?, ?, ?)",
+        "2024-01-02 09:30:00",
+        problem,
+        1,
+    )
+
+
+def test_problems_reselect_on_worker(db, worker):
+    addTopic(db)
+    addProblem(db, "fractions")
+    model = ProblemsModel(db)
+    model.setWorker(worker)
+    assert model.rowCount() == 1
+
+    threads = []
+    worker.submit(lambda _: threads.append(threading.get_ident()))
+    assert waitFor(lambda: threads)
+    assert threads[0] != threading.get_ident()
+
+    addProblem(db, "decimals")
+    model.select()
+    # shown once the worker has read them
+    assert model.rowCount() == 1
+    assert waitFor(lambda: model.rowCount() == 2)
+    assert model.columnValues(model.fieldIndex("problem")) == [
+        "fractions",
+        "decimals",
+    ]
+    assert model.index(1, model.fieldIndex("topic_id")).data() == "maths"
+    assert model.registry.id("decimals") == 2
+
+
+def test_read_problem_columns(db):
+    addTopic(db)
+    addProblem(db, "fractions")
+
+    titles, (ids, times, problems, topic_ids, solved) = readProblemColumns(db)
+
+    assert titles == {1: "maths"}
+    assert ids == [1]
+    assert problems == ["fractions"]
+    assert topic_ids == [1]
+    assert solved == [0]
+
+
+def test_profile_applied_on_worker_connection(worker):
+    def cacheSize(db):
+        query = QSqlQuery(db=db)
+        assert query.exec("PRAGMA cache_size") and query.next()
+        return query.value(0)
+
+    sizes = []
+    worker.submit(cacheSize).done.connect(sizes.append)
+    worker.submit(applyProfile, {"cache_size": -1000})
+    worker.submit(cacheSize).done.connect(sizes.append)
+
+    assert waitFor(lambda: len(sizes) == 2)
+    assert sizes == [DEFAULT_SETTINGS["db_profile"]["cache_size"], -1000]
+
+
+def test_write_job_holds_the_write_lock_from_its_first_read(db, db_path, worker):
+    addTopic(db)
+    other_writes = []
+
+    def readThenWrite(conn):
+        query = QSqlQuery(db=conn)
+        assert query.exec("SELECT COUNT(*) FROM problems") and query.next()
+        query.finish()
+
+        # a write committed elsewhere after the read
+        other = QSqlDatabase.addDatabase("QSQLITE", "other")
+        other.setDatabaseName(db_path)
+        other.setConnectOptions("QSQLITE_BUSY_TIMEOUT=0")
+        assert other.open()
+        other_writes.append(
+            QSqlQuery(db=other).exec(
+                "INSERT INTO problems (timestamp, problem, topic_id) "
+                "VALUES ('2024-01-02 09:30:00', 'other', 1)"
+            )
+        )
+        other.close()
+        del other
+        QSqlDatabase.removeDatabase("other")
+
+        if not query.exec(
+            "INSERT INTO problems (timestamp, problem, topic_id) "
+            "VALUES ('2024-01-02 09:30:00', 'job', 1)"
+        ):
+            raise RuntimeError(query.lastError().text())
+
+    results = []
+    job = worker.submit(readThenWrite, write=True)
+    job.done.connect(lambda _: results.append("done"))
+    job.failed.connect(results.append)
+
+    assert waitFor(lambda: results)
+    assert results == ["done"]
+    # the other connection was kept out while the job held its transaction
+    assert other_writes == [False]
+    query = QSqlQuery(db=db)
+    assert query.exec("SELECT problem FROM problems") and query.next()
+    assert query.value(0) == "job"
+
+
+def test_suspended_worker_holds_jobs_until_resumed(db, worker):
+    addTopic(db)
+    worker.suspend()
+    # the file may be replaced now
+    assert CONNECTION not in QSqlDatabase.connectionNames()
+
+    results = []
+    worker.submit(readProblemColumns).done.connect(results.append)
+    assert not waitFor(lambda: results, timeout=100)
+
+    worker.resume(DEFAULT_SETTINGS["db_profile"])
+    assert waitFor(lambda: results)
+    titles, _ = results[0]
+    assert titles == {1: "maths"}
@@ -0,0 +1,113 @@
+import pytest
+from dataclasses import asdict
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+from conftest import execute
+from datastructures.datas import ActivityData
+from journal import NoteJournal, applyEntries, appliedSeq, deadLetter, readJournal
+from models import DatabaseBusy
+
+
+def entry(seq: int, topic_id: int, note: str):
+    activity = ActivityData(
+        timestamp="2024-01-02 09:30:00", topic_id=topic_id, note=note
+    )
+    return {"seq": seq, "activity": asdict(activity)}
+
+
+def apply(db, entries, failed_path):
+    db.transaction()
+    result = applyEntries(db, entries, failed_path)
+    assert db.commit()
+    return result
+
+
+def test_failed_entry_is_moved_to_dead_letter_file(db, tmp_path):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+        "2024-01-01 00:00:00",
+        "maths",
+        "09:00:00",
+        "10:00:00",
+    )
+    failed_path = str(tmp_path / "app.sqlite.notes.failed.jsonl")
+    # topic 99 does not exist; the foreign key fails
+    entries = [entry(1, 1, "first"), entry(2, 99, "lost?"), entry(3, 1, "third")]
+
+    applied, note_ids, _, _ = apply(db, entries, failed_path)
+
+    assert applied == 3
+    assert appliedSeq(db) == 3
+    assert len(note_ids) == 2
+    (failed,) = readJournal(failed_path)
+    assert failed["seq"] == 2
+    assert failed["activity"] == entries[1]["activity"]
+    assert "FOREIGN KEY" in failed["error"]
+
+    # a replay skips what was applied, and keeps nothing twice
+    assert apply(db, entries, failed_path)[1] == []
+    assert len(readJournal(failed_path)) == 1
+
+
+def test_dead_letter_keeps_entries_once(tmp_path):
+    path = str(tmp_path / "failed.jsonl")
+    deadLetter(path, [entry(1, 1, "a"), entry(2, 1, "b")])
+    deadLetter(path, [entry(2, 1, "b"), entry(3, 1, "c")])
+
+    assert [e["seq"] for e in readJournal(path)] == [1, 2, 3]
+
+
+def test_busy_entry_fails_the_batch_instead_of_dead_lettering(db, db_path, tmp_path):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+        "2024-01-01 00:00:00",
+        "maths",
+        "09:00:00",
+        "10:00:00",
+    )
+    failed_path = str(tmp_path / "app.sqlite.notes.failed.jsonl")
+    other = QSqlDatabase.addDatabase("QSQLITE", "other")
+    other.setDatabaseName(db_path)
+    other.setConnectOptions("QSQLITE_BUSY_TIMEOUT=0")
+    assert other.open()
+    try:
+        # the GUI connection holds the write lock
+        execute(db, "BEGIN IMMEDIATE")
+        with pytest.raises(DatabaseBusy):
+            applyEntries(other, [entry(1, 1, "busy")], failed_path)
+        QSqlQuery(db=other).exec("ROLLBACK")
+        execute(db, "ROLLBACK")
+
+        assert readJournal(failed_path) == []
+        assert appliedSeq(db) == 0
+    finally:
+        other.close()
+        del other
+        QSqlDatabase.removeDatabase("other")
+
+
+def test_failed_flush_is_retried(qapp, db_path):
+    journal = NoteJournal(db_path, 0, worker=None)
+
+    journal._onFailed("database is locked")
+
+    assert journal._timer.isActive()
+
+
+def test_rebase_renumbers_pending_entries_after_a_restore(qapp, db_path):
+    journal = NoteJournal(db_path, 0, worker=None)
+    for note in ("first", "second"):
+        journal.append(ActivityData(**entry(0, 1, note)["activity"]))
+    # a flush the suspended worker holds
+    held = list(journal._pending)
+
+    # the restored database applied up to seq 10
+    journal.rebase(10)
+    journal._timer.stop()
+
+    assert [e["seq"] for e in held] == [11, 12]
+    assert [e["seq"] for e in readJournal(journal.path)] == [11, 12]
+    journal.append(ActivityData(**entry(0, 1, "third")["activity"]))
+    journal._timer.stop()
+    assert journal._pending[-1]["seq"] == 13
@@ -0,0 +1,71 @@
+from PyQt6.QtCore import QModelIndex
+from conftest import execute
+from models import NotesModel
+
+
+def setUp(db, notes: int):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+        "2024-01-01 00:00:00",
+        "maths",
+        "09:00:00",
+        "10:00:00",
+    )
+    for i in range(notes):
+        addNote(db, f"2024-01-02 09:{i:02}:00", f"n{i}")
+
+
+def addNote(db, timestamp: str, note: str):
+    query = execute(
+        db,
+        "INSERT INTO notes (timestamp, topic_id, note) VALUES (?, ?, ?)",
+        timestamp,
+        1,
+        note,
+    )
+    return query.lastInsertId()
+
+
+def loaded(model: NotesModel):
+    while model.canFetchMore(QModelIndex()):
+        model.fetchMore(QModelIndex())
+    return [model.index(row, 3).data() for row in range(model.rowCount())]
+
+
+def test_newer_note_goes_on_top(db):
+    setUp(db, 3)
+    model = NotesModel(db)
+    loaded(model)
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+
+    model.showInserted([addNote(db, "2024-01-03 09:00:00", "newest")])
+
+    assert not resets
+    assert loaded(model) == ["newest", "n2", "n1", "n0"]
+
+
+def test_note_fetched_before_it_is_shown_is_not_repeated(db):
+    setUp(db, 3)
+    model = NotesModel(db)
+    loaded(model)
+    note_id = addNote(db, "2024-01-03 09:00:00", "journaled")
+    # the view fetches again before the journal reports the note
+    model.select()
+    loaded(model)
+
+    model.showInserted([note_id])
+    model.showInserted([note_id])
+
+    assert loaded(model) == ["journaled", "n2", "n1", "n0"]
+
+
+def test_backdated_note_keeps_its_place(db):
+    setUp(db, 3)
+    model = NotesModel(db)
+    loaded(model)
+
+    model.showInserted([addNote(db, "2024-01-02 09:01:30", "backdated")])
+
+    assert loaded(model) == ["n2", "backdated", "n1", "n0"]
@@ -0,0 +1,75 @@
+from conftest import execute
+from models import ProblemsModel, writeActivity
+from datastructures.datas import ActivityData
+
+
+def setUp(db):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+        "2024-01-01 00:00:00",
+        "maths",
+        "09:00:00",
+        "10:00:00",
+    )
+    execute(
+        db,
+        "INSERT INTO problems (timestamp, problem, topic_id) VALUES (?, ?, ?)",
+        "2024-01-01 09:30:00",
+        "fractions",
+        1,
+    )
+
+
+def write(db, activity: ActivityData):
+    db.transaction()
+    ids = writeActivity(db, activity)
+    assert db.commit()
+    return ids
+
+
+def test_activity_patches_problem_rows(db):
+    setUp(db)
+    model = ProblemsModel(db)
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+    solved_col = model.fieldIndex("solved")
+    assert model.rowCount() == 1
+    assert model.index(0, solved_col).data() == 0
+
+    note_id, problem_id, solved_id = write(
+        db,
+        ActivityData(
+            timestamp="2024-01-02 09:30:00",
+            topic_id=1,
+            note="worked on it",
+            problem="decimals",
+            solved_id=1,
+        ),
+    )
+    assert note_id is not None
+    assert problem_id is not None
+    assert solved_id == 1
+
+    model.showInserted([problem_id])
+    model.showUpdated([solved_id])
+
+    assert not resets
+    assert model.rowCount() == 2
+    assert model.index(0, solved_col).data() == 1
+    row = model.registry.row(problem_id)
+    assert model.index(row, model.fieldIndex("problem")).data() == "decimals"
+    assert model.index(row, model.fieldIndex("topic_id")).data() == "maths"
+    assert model.index(row, solved_col).data() == 0
+
+
+def test_existing_problem_is_not_inserted_again(db):
+    setUp(db)
+    _, problem_id, solved_id = write(
+        db,
+        ActivityData(
+            timestamp="2024-01-02 09:30:00", topic_id=1, problem="fractions"
+        ),
+    )
+    assert problem_id is None
+    assert solved_id is None
@@ -0,0 +1,153 @@
+import sqlite3
+from contextlib import closing
+from PyQt6.QtCore import QModelIndex
+from PyQt6.QtSql import QSqlDatabase
+from conftest import execute
+from models import NotesModel, ProblemsModel, SearchableModel
+from search import SearchIndex
+from database import openDatabase
+from migrations import MIGRATIONS, migrate, schemaVersion
+from constants import DEFAULT_SETTINGS
+
+
+def setUp(db):
+    for title, starts, ends in (
+        ("algebra", "09:00:00", "10:00:00"),
+        ("history", "14:30:00", "15:00:00"),
+    ):
+        execute(
+            db,
+            "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+            "2024-01-01 00:00:00",
+            title,
+            starts,
+            ends,
+        )
+    for topic_id, note in ((1, "read chapter two"), (2, "wrote an essay")):
+        execute(
+            db,
+            "INSERT INTO notes (timestamp, topic_id, note) VALUES (?, ?, ?)",
+            "2024-01-02 09:30:00",
+            topic_id,
+            note,
+        )
+    execute(
+        db,
+        "INSERT INTO problems (timestamp, problem, topic_id) VALUES (?, ?, ?)",
+        "2024-01-02 09:30:00",
+        "quadratics",
+        1,
+    )
+    index = SearchIndex(db)
+    assert index.available
+    return index
+
+
+def proxy(model, index, table: str):
+    searchable = SearchableModel()
+    searchable.setSourceModel(model)
+    searchable.setSearchIndex(index, table)
+    return searchable
+
+
+def loaded(model):
+    while model.canFetchMore(QModelIndex()):
+        model.fetchMore(QModelIndex())
+    return model.rowCount()
+
+
+def test_match_by_topic_title(db):
+    index = setUp(db)
+
+    assert list(index.match("notes", "algebra")) == [1]
+    assert list(index.match("notes", "hist")) == [2]
+    assert list(index.match("problems", "algebra")) == [1]
+
+
+def test_own_text_ranks_before_topic_title(db):
+    index = setUp(db)
+    execute(
+        db,
+        "INSERT INTO notes (timestamp, topic_id, note) VALUES (?, ?, ?)",
+        "2024-01-03 09:30:00",
+        2,
+        "more algebra",
+    )
+
+    assert list(index.match("notes", "algebra")) == [3, 1]
+
+
+def test_match_topics_by_time(db):
+    index = setUp(db)
+
+    assert list(index.match("topics", "14:30")) == [2]
+    assert list(index.match("topics", "10")) == [1]
+
+
+def test_search_tables_by_topic_title(db):
+    index = setUp(db)
+
+    notes = proxy(NotesModel(db), index, "notes")
+    notes.search("algebra")
+    assert loaded(notes) == 1
+    assert notes.index(0, 3).data() == "read chapter two"
+
+    problems = proxy(ProblemsModel(db), index, "problems")
+    problems.search("algebra")
+    assert problems.rowCount() == 1
+    problems.search("")
+    assert problems.rowCount() == 1
+    problems.search("history")
+    assert problems.rowCount() == 0
+
+
+def test_migration_indexes_rows_written_before_it(qapp, db_path):
+    # a database, or a restored backup, from before full-text search
+    with closing(sqlite3.connect(db_path)) as conn:
+        for sql in (s for version in MIGRATIONS[:4] for s in version):
+            conn.execute(sql)
+        conn.execute("PRAGMA user_version = 4")
+        conn.execute(
+            "INSERT INTO topics (timestamp, topic, starts, ends) "
+            "VALUES ('2024-01-01 00:00:00', 'algebra', '09:00:00', '10:00:00')"
+        )
+        conn.execute(
+            "INSERT INTO notes (timestamp, topic_id, note) "
+            "VALUES ('2024-01-02 09:30:00', 1, 'read chapter two')"
+        )
+        conn.commit()
+
+    db = openDatabase(db_path, DEFAULT_SETTINGS["db_profile"])
+    try:
+        assert migrate(db)
+        assert schemaVersion(db) == len(MIGRATIONS)
+        index = SearchIndex(db)
+        assert index.available
+        assert list(index.match("notes", "chapter")) == [1]
+        assert list(index.match("notes", "algebra")) == [1]
+    finally:
+        db.close()
+        del db
+        QSqlDatabase.removeDatabase("qt_sql_default_connection")
+
+
+def test_index_does_not_hold_a_read_snapshot(db, db_path):
+    index = SearchIndex(db)
+    assert index.available
+
+    # a write from another connection, like the database worker's
+    other = openDatabase(db_path, DEFAULT_SETTINGS["db_profile"], name="other")
+    execute(
+        other,
+        "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+        "2024-01-01 00:00:00",
+        "algebra",
+        "09:00:00",
+        "10:00:00",
+    )
+    other.close()
+    del other
+    QSqlDatabase.removeDatabase("other")
+
+    query = execute(db, "SELECT COUNT(*) FROM topics")
+    assert query.next() and query.value(0) == 1
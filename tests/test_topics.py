@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from PyQt6.QtCore import QTimer
+from conftest import execute, waitFor
+from models import TopicsModel, readTopics, today
+from datastructures.coalescer import ChangeCoalescer
+from dbworker import Job
+from scheduler import NotificationScheduler
+from datastructures.intervals import TopicIntervals
+from constants import TIMEZONE
+
+
+def addTopic(db, title: str, starts: str, ends: str):
+    execute(
+        db,
+        "INSERT INTO topics (timestamp, topic, starts, ends) VALUES (?, ?, ?, ?)",
+        "2024-01-01 00:00:00",
+        title,
+        starts,
+        ends,
+    )
+
+
+def test_wrapping_topic_ends_next_day(db):
+    addTopic(db, "night", "22:00:00", "02:00:00")
+    addTopic(db, "day", "09:00:00", "17:00:00")
+    midnight = today()
+
+    topics = {t.title: t for t in readTopics(db, midnight)}
+
+    night = topics["night"]
+    assert night.starts == midnight + timedelta(hours=22)
+    assert night.ends == midnight + timedelta(days=1, hours=2)
+    assert night.ends > night.starts
+    assert topics["day"].ends == midnight + timedelta(hours=17)
+
+
+def test_wrapping_topic_after_midnight_is_last_nights(db):
+    addTopic(db, "night", "22:00:00", "02:00:00")
+    midnight = today()
+    intervals = TopicIntervals(readTopics(db, midnight))
+
+    (running,) = intervals.covering(midnight + timedelta(hours=1))
+    assert running.starts == midnight - timedelta(hours=2)
+    assert running.ends == midnight + timedelta(hours=2)
+    assert intervals.closest(midnight + timedelta(hours=1)) == running
+    assert intervals.covering(midnight + timedelta(hours=3)) == []
+    (running,) = intervals.covering(midnight + timedelta(hours=23))
+    assert running.ends == midnight + timedelta(days=1, hours=2)
+
+
+def test_scheduler_boundary_is_in_the_future(db):
+    addTopic(db, "night", "22:00:00", "02:00:00")
+    scheduler = NotificationScheduler()
+    now = datetime.now(tz=TIMEZONE)
+
+    scheduler.setTopics(readTopics(db, today()))
+
+    assert scheduler._next is not None
+    assert scheduler._next > now
+    midnight = today()
+    assert scheduler._boundaries == [
+        midnight + timedelta(hours=2),
+        midnight + timedelta(hours=22),
+        midnight + timedelta(days=1, hours=2),
+    ]
+
+
+class FailingWorker:
+    """submits jobs that fail, then jobs that run on `db`"""
+
+    def __init__(self, db, failures: int):
+        self.db = db
+        self.failures = failures
+        self.jobs = 0
+
+    def submit(self, fn, *args):
+        self.jobs += 1
+        job = Job(fn, args, False)
+        if self.failures:
+            self.failures -= 1
+            QTimer.singleShot(0, lambda: job._finished.emit(None, "locked"))
+        else:
+            QTimer.singleShot(0, lambda: job._finished.emit(fn(self.db, *args), ""))
+        return job
+
+
+def test_failed_rebuild_keeps_the_topics_and_retries(db, monkeypatch):
+    import datastructures.timeline as timeline
+
+    monkeypatch.setattr(timeline, "RETRY_MS", 10)
+    addTopic(db, "day", "09:00:00", "17:00:00")
+    model = TopicsModel(db)
+    worker = FailingWorker(db, failures=2)
+    topics = timeline.TopicTimeline(model, ChangeCoalescer(), worker)
+    anchored = topics.topics
+    changes, done = [], []
+    topics.changed.connect(lambda: changes.append(list(topics.topics)))
+
+    addTopic(db, "night", "22:00:00", "02:00:00")
+    topics.rebuild()
+    topics.afterRebuild(lambda: done.append(True))
+
+    waitFor(lambda: worker.jobs >= 2)
+    # not rebuilt from the failed read
+    assert not changes
+    assert not done
+    assert topics.topics is anchored
+
+    assert waitFor(lambda: done)
+    assert worker.jobs == 3
+    assert [t.title for t in topics.topics] == ["day", "night"]
+    assert len(changes) == 1